@@ -10,6 +10,8 @@ import base64
 from typing import Dict, List, Any, Optional
 import json
 from plotly.utils import PlotlyJSONEncoder
+from aggregation_engine import AggregationEngine
+from correlation_network import CorrelationNetwork
 
 class AdvancedVisualizer:
     """Advanced visualization utilities for data analysis"""
@@ -17,6 +19,8 @@ class AdvancedVisualizer:
     def __init__(self):
         plt.style.use('seaborn-v0_8')
         self.color_palette = px.colors.qualitative.Set1
+        self.aggregation_engine = AggregationEngine()
+        self.correlation_network = CorrelationNetwork()
     
     def create_distribution_analysis(self, df: pd.DataFrame, columns: List[str] = None) -> Dict[str, Any]:
         """Create comprehensive distribution analysis"""
@@ -39,73 +43,52 @@ class AdvancedVisualizer:
         
         return {"visualizations": visualizations}
     
-    def create_correlation_network(self, df: pd.DataFrame, threshold: float = 0.5) -> str:
+    def create_correlation_network(self, df: pd.DataFrame, threshold: float = 0.5,
+                                   dataset_id: Optional[str] = None) -> str:
         """Create a network graph of correlations"""
         numeric_cols = df.select_dtypes(include=[np.number]).columns
         if len(numeric_cols) < 2:
             return None
         
-        corr_matrix = df[numeric_cols].corr()
-        
-        # Create network graph
-        edges = []
-        nodes = list(numeric_cols)
-        
-        for i in range(len(nodes)):
-            for j in range(i+1, len(nodes)):
-                corr_val = corr_matrix.iloc[i, j]
-                if abs(corr_val) > threshold:
-                    edges.append({
-                        'source': nodes[i],
-                        'target': nodes[j],
-                        'weight': abs(corr_val),
-                        'correlation': corr_val
-                    })
-        
-        # Create network visualization using plotly
-        import networkx as nx
-        G = nx.Graph()
-        
-        for node in nodes:
-            G.add_node(node)
-        
-        for edge in edges:
-            G.add_edge(edge['source'], edge['target'], weight=edge['weight'])
-        
-        pos = nx.spring_layout(G)
-        
-        # Create edge traces
-        edge_x = []
-        edge_y = []
-        for edge in G.edges():
-            x0, y0 = pos[edge[0]]
-            x1, y1 = pos[edge[1]]
-            edge_x.extend([x0, x1, None])
-            edge_y.extend([y0, y1, None])
-        
-        edge_trace = go.Scatter(x=edge_x, y=edge_y,
-                               line=dict(width=2, color='gray'),
-                               hoverinfo='none',
-                               mode='lines')
+        network = self.correlation_network.analyze(df, threshold, dataset_id)
+        return json.dumps(self.create_network_figure(network), cls=PlotlyJSONEncoder)
+    
+    def create_network_figure(self, network: Dict[str, Any]) -> go.Figure:
+        """Draw a laid-out correlation network, coloring nodes by community"""
+        pos = {node['name']: (node['x'], node['y']) for node in network['nodes']}
+        
+        # Create edge traces, one for positive and one for negative correlations
+        edge_traces = []
+        for sign, color in [(1, 'gray'), (-1, 'indianred')]:
+            edge_x = []
+            edge_y = []
+            for edge in network['edges']:
+                if np.sign(edge['correlation']) == sign:
+                    x0, y0 = pos[edge['source']]
+                    x1, y1 = pos[edge['target']]
+                    edge_x.extend([x0, x1, None])
+                    edge_y.extend([y0, y1, None])
+            edge_traces.append(go.Scatter(x=edge_x, y=edge_y,
+                                          line=dict(width=1, color=color),
+                                          hoverinfo='none',
+                                          mode='lines'))
         
         # Create node traces
-        node_x = []
-        node_y = []
-        node_text = []
-        for node in G.nodes():
-            x, y = pos[node]
-            node_x.append(x)
-            node_y.append(y)
-            node_text.append(node)
-        
-        node_trace = go.Scatter(x=node_x, y=node_y,
-                               mode='markers+text',
+        nodes = network['nodes']
+        show_labels = len(nodes) <= 50
+        node_trace = go.Scatter(x=[node['x'] for node in nodes],
+                               y=[node['y'] for node in nodes],
+                               mode='markers+text' if show_labels else 'markers',
                                hoverinfo='text',
-                               text=node_text,
+                               text=[node['name'] for node in nodes] if show_labels else None,
+                               hovertext=[f"{node['name']}<br>community {node['community']}<br>degree {node['degree']}"
+                                          for node in nodes],
                                textposition="middle center",
-                               marker=dict(size=20, color='lightblue'))
+                               marker=dict(size=20 if show_labels else 8,
+                                           color=[self.color_palette[node['community'] % len(self.color_palette)]
+                                                  if node['degree'] > 0 else 'lightgray' for node in nodes]))
         
-        fig = go.Figure(data=[edge_trace, node_trace],
+        fig = go.Figure(data=edge_traces + [node_trace],
                        layout=go.Layout(
                            title='Correlation Network',
                            titlefont_size=16,
@@ -113,14 +96,14 @@ class AdvancedVisualizer:
                            hovermode='closest',
                            margin=dict(b=20,l=5,r=5,t=40),
                            annotations=[ dict(
-                               text="Correlation Network (|r| > " + str(threshold) + ")",
+                               text="Correlation Network (|r| > " + str(network['threshold']) + ")",
                                showarrow=False,
                                xref="paper", yref="paper",
                                x=0.005, y=-0.002 ) ],
                            xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
                            yaxis=dict(showgrid=False, zeroline=False, showticklabels=False)))
         
-        return json.dumps(fig, cls=PlotlyJSONEncoder)
+        return fig
     
     def create_time_series_analysis(self, df: pd.DataFrame, date_col: str, value_cols: List[str]) -> Dict[str, Any]:
         """Create time series analysis visualizations"""
@@ -158,8 +141,12 @@ class AdvancedVisualizer:
         
         return {"visualizations": visualizations}
     
-    def create_advanced_scatter_matrix(self, df: pd.DataFrame, columns: List[str] = None) -> str:
-        """Create an advanced scatter plot matrix"""
+    def create_advanced_scatter_matrix(self, df: pd.DataFrame, columns: List[str] = None,
+                                       mode: str = "scatter", bins: int = 20, max_columns: int = 25) -> str:
+        """Create an advanced scatter plot matrix; `density` mode draws binned counts instead of raw points"""
+        if mode == "density":
+            return self.create_density_matrix(df, columns, bins, max_columns)
+        
         if columns is None:
             numeric_cols = df.select_dtypes(include=[np.number]).columns
             columns = numeric_cols.tolist()[:4]  # Limit to 4 columns for performance
@@ -173,7 +160,64 @@ class AdvancedVisualizer:
         
         return json.dumps(fig, cls=PlotlyJSONEncoder)
     
-    def create_categorical_analysis(self, df: pd.DataFrame, categorical_cols: List[str] = None) -> Dict[str, Any]:
+    def create_density_matrix(self, df: pd.DataFrame, columns: List[str] = None, bins: int = 20,
+                              max_columns: int = 25) -> str:
+        """Scatter matrix of pairwise 2D histograms with 1D histograms on the diagonal; size does not depend on row count"""
+        if columns is None:
+            columns = df.select_dtypes(include=[np.number]).columns.tolist()[:max_columns]
+        
+        if len(columns) < 2:
+            return None
+        
+        counts, edges = self.aggregation_engine.pairwise_histograms(df, columns, bins)
+        
+        # Lay the grid out directly; make_subplots is slow for hundreds of cells
+        n = len(columns)
+        gap = 0.02 / n
+        size = (1 - gap * (n - 1)) / n
+        layout = {}
+        traces = []
+        for i in range(n):
+            for j in range(i + 1):
+                k = i * n + j + 1
+                x_domain = [j * (size + gap), min(1, j * (size + gap) + size)]
+                y_domain = [max(0, 1 - i * (size + gap) - size), 1 - i * (size + gap)]
+                layout[f'xaxis{k}'] = dict(domain=x_domain, anchor=f'y{k}', showticklabels=i == n - 1,
+                                           title=dict(text=columns[j]) if i == n - 1 else None)
+                layout[f'yaxis{k}'] = dict(domain=y_domain, anchor=f'x{k}', showticklabels=j == 0 and i > 0,
+                                           title=dict(text=columns[i]) if j == 0 else None)
+                
+                x_edges = edges[j]
+                dx = x_edges[1] - x_edges[0]
+                if i == j:
+                    traces.append(go.Bar(x=(x_edges[:-1] + dx / 2).tolist(), y=np.diag(counts[i, i]).tolist(),
+                                         width=dx, marker_color=self.color_palette[1],
+                                         xaxis=f'x{k}', yaxis=f'y{k}', name=columns[i],
+                                         hovertemplate=f'{columns[i]}: %{{x}}<br>count: %{{y}}<extra></extra>'))
+                else:
+                    y_edges = edges[i]
+                    dy = y_edges[1] - y_edges[0]
+                    # Empty bins are left transparent
+                    z = np.where(counts[i, j] > 0, counts[i, j], np.nan)
+                    traces.append(go.Heatmap(z=z.tolist(), x0=x_edges[0] + dx / 2, dx=dx,
+                                             y0=y_edges[0] + dy / 2, dy=dy,
+                                             coloraxis='coloraxis', xaxis=f'x{k}', yaxis=f'y{k}',
+                                             hovertemplate=f'{columns[j]}: %{{x}}<br>{columns[i]}: %{{y}}'
+                                                           '<br>count: %{z}<extra></extra>'))
+        
+        fig = go.Figure(data=traces, layout=dict(
+            title='Scatter Plot Matrix (binned)',
+            showlegend=False,
+            bargap=0,
+            coloraxis=dict(colorscale='Viridis', colorbar=dict(title='count')),
+            height=max(600, 120 * n), width=max(600, 120 * n),
+            **layout
+        ))
+        
+        return json.dumps(fig, cls=PlotlyJSONEncoder)
+    
+    def create_categorical_analysis(self, df: pd.DataFrame, categorical_cols: List[str] = None,
+                                    profiles: Dict[str, Any] = None) -> Dict[str, Any]:
         """Create visualizations for categorical data analysis"""
         if categorical_cols is None:
             categorical_cols = df.select_dtypes(include=['object']).columns.tolist()[:3]
@@ -182,8 +226,12 @@ class AdvancedVisualizer:
         
         for col in categorical_cols:
             if col in df.columns:
-                # Count plot
-                value_counts = df[col].value_counts()
+                # Count plot, from the profile's top values when a profile is available
+                if profiles is not None and col in profiles:
+                    top_values = profiles[col].heavy_hitters.top(50)
+                    value_counts = pd.Series([v["count"] for v in top_values], index=[v["value"] for v in top_values])
+                else:
+                    value_counts = df[col].value_counts()
                 fig = px.bar(x=value_counts.index, y=value_counts.values,
                             title=f'Count Distribution: {col}',
                             labels={'x': col, 'y': 'Count'})
@@ -216,7 +264,8 @@ class AdvancedVisualizer:
         
         return {"visualizations": visualizations}
     
-    def create_comparative_analysis(self, df: pd.DataFrame, group_col: str, numeric_cols: List[str]) -> Dict[str, Any]:
+    def create_comparative_analysis(self, df: pd.DataFrame, group_col: str, numeric_cols: List[str],
+                                    aggregated: bool = False) -> Dict[str, Any]:
         """Create comparative analysis between groups"""
         if group_col not in df.columns:
             return {"error": f"Group column '{group_col}' not found"}
@@ -224,7 +273,18 @@ class AdvancedVisualizer:
         visualizations = {}
         
         for col in numeric_cols:
-            if col in df.columns:
+            if col in df.columns and aggregated:
+                # Box plot drawn from per-group quartiles instead of raw points
+                stats = self.aggregation_engine.box_statistics(df, group_col, col)
+                fig = go.Figure(go.Box(
+                    x=[str(g) for g in stats.index],
+                    q1=stats["q1"], median=stats["median"], q3=stats["q3"],
+                    lowerfence=stats["lowerfence"], upperfence=stats["upperfence"],
+                    mean=stats["mean"], name=col
+                ))
+                fig.update_layout(title=f'{col} by {group_col}', xaxis_title=group_col, yaxis_title=col)
+                visualizations[f"group_comparison_{col}"] = json.dumps(fig, cls=PlotlyJSONEncoder)
+            elif col in df.columns:
                 # Group comparison box plot
                 fig = px.box(df, x=group_col, y=col, 
                             title=f'{col} by {group_col}')
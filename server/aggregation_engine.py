@@ -0,0 +1,174 @@
+from typing import Dict, List, Any, Optional, Tuple
+import pandas as pd
+import numpy as np
+import json
+
+
+class AggregationEngine:
+    """Utility class for server-side group-by and pivot aggregations"""
+
+    # Aggregate functions accepted as `func:column`; `count` without a column counts rows.
+    # Quantiles are written as `p<percentile>:column`, e.g. `p90:price`.
+    SUPPORTED_FUNCTIONS = ["count", "sum", "mean", "median", "min", "max", "std", "distinct"]
+
+    def __init__(self, category_ratio: float = 0.5):
+        self.category_ratio = category_ratio
+
+    def compact(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Return a copy with repetitive text columns stored as categoricals"""
+        # Shallow copy: unchanged columns share their data with the dataset, only converted ones are replaced
+        compacted = df.copy(deep=False)
+        for col in df.select_dtypes(include=["object"]).columns:
+            n_unique = df[col].nunique(dropna=True)
+            if len(df) > 0 and n_unique <= len(df) * self.category_ratio:
+                compacted[col] = df[col].astype("category")
+        return compacted
+
+    def parse_aggregations(self, aggregations: Optional[List[str]]) -> List[Tuple[str, str, Optional[str], Optional[float]]]:
+        """Parse `func:column` strings into (name, func, column, quantile) tuples"""
+        parsed = []
+        for raw in aggregations or ["count"]:
+            func, _, column = raw.partition(":")
+            func = func.lower()
+            column = column or None
+            quantile = None
+
+            if func.startswith("p") and func[1:].replace(".", "", 1).isdigit():
+                quantile = float(func[1:]) / 100
+                if not 0 <= quantile <= 1:
+                    raise ValueError(f"Quantile out of range in '{raw}'")
+                func = "quantile"
+            elif func not in self.SUPPORTED_FUNCTIONS:
+                raise ValueError(f"Unsupported aggregate '{func}'. Use one of: {', '.join(self.SUPPORTED_FUNCTIONS)} or p<percentile>")
+
+            if column is None and func != "count":
+                raise ValueError(f"Aggregate '{raw}' requires a column, e.g. '{func}:column'")
+
+            name = func if column is None else f"{raw.partition(':')[0].lower()}_{column}"
+            parsed.append((name, func, column, quantile))
+        return parsed
+
+    def spec_key(self, group_by: List[str], aggregations: Optional[List[str]], pivot: Optional[str], top_n: Optional[int]) -> str:
+        """Canonical string identifying an aggregation request, used as a cache key"""
+        return json.dumps({
+            "group_by": list(group_by),
+            "aggregations": list(aggregations or ["count"]),
+            "pivot": pivot,
+            "top_n": top_n,
+        }, sort_keys=True)
+
+    def _aggregate_series(self, grouped, func: str, column: Optional[str], quantile: Optional[float]) -> pd.Series:
+        """Compute one aggregate over all groups"""
+        if column is None:
+            return grouped.size()
+        series = grouped[column]
+        if func == "count":
+            return series.count()
+        if func == "distinct":
+            return series.nunique()
+        if func == "quantile":
+            return series.quantile(quantile)
+        return getattr(series, func)()
+
+    def aggregate(self, df: pd.DataFrame, group_by: List[str], aggregations: Optional[List[str]] = None,
+                  pivot: Optional[str] = None, top_n: Optional[int] = None) -> Dict[str, Any]:
+        """Group, aggregate and optionally pivot the data"""
+        if not group_by:
+            raise ValueError("At least one group_by column is required")
+
+        parsed = self.parse_aggregations(aggregations)
+        referenced = list(group_by) + ([pivot] if pivot else []) + [col for _, _, col, _ in parsed if col]
+        missing = [c for c in referenced if c not in df.columns]
+        if missing:
+            raise ValueError(f"Columns not found: {', '.join(dict.fromkeys(missing))}")
+        if pivot in group_by:
+            raise ValueError("pivot column must not also be a group_by column")
+
+        for name, func, column, _ in parsed:
+            if func not in ["count", "distinct"] and not pd.api.types.is_numeric_dtype(df[column]):
+                raise ValueError(f"Aggregate '{name}' requires a numeric column")
+
+        # Rank groups by row count and keep only the rows of the top-N groups
+        ranked = df.groupby(group_by, observed=True, dropna=False).size().sort_values(ascending=False, kind="mergesort")
+        total_groups = len(ranked)
+        if top_n is not None and top_n > 0 and total_groups > top_n:
+            ranked = ranked.iloc[:top_n]
+            if len(group_by) == 1:
+                row_mask = df[group_by[0]].isin(ranked.index)
+            else:
+                row_mask = pd.MultiIndex.from_frame(df[group_by]).isin(ranked.index)
+            df = df[row_mask]
+
+        keys = list(group_by) + ([pivot] if pivot else [])
+        grouped = df.groupby(keys, observed=True, dropna=False, sort=False)
+        result = pd.DataFrame({
+            name: self._aggregate_series(grouped, func, column, quantile)
+            for name, func, column, quantile in parsed
+        })
+
+        if pivot:
+            result = result.unstack(pivot)
+            result.columns = [f"{name}[{value}]" for name, value in result.columns]
+
+        # Largest groups first
+        result = result.reindex(ranked.index).reset_index()
+
+        return {
+            "group_by": list(group_by),
+            "aggregations": [name for name, _, _, _ in parsed],
+            "pivot": pivot,
+            "total_groups": int(total_groups),
+            "returned_groups": int(len(result)),
+            "columns": [str(c) for c in result.columns],
+            "data": json.loads(result.to_json(orient="records", date_format="iso", default_handler=str,
+                                              double_precision=15)),
+        }
+
+    def box_statistics(self, df: pd.DataFrame, group_col: str, value_col: str) -> pd.DataFrame:
+        """Per-group quartiles and whisker fences (clipped to the data range) for drawing box plots without raw points"""
+        grouped = df.groupby(group_col, observed=True, sort=True)[value_col]
+        stats = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+        stats.columns = ["q1", "median", "q3"]
+        iqr = stats["q3"] - stats["q1"]
+        stats["lowerfence"] = np.maximum(stats["q1"] - 1.5 * iqr, grouped.min())
+        stats["upperfence"] = np.minimum(stats["q3"] + 1.5 * iqr, grouped.max())
+        stats["mean"] = grouped.mean()
+        return stats
+
+    def bin_codes(self, values: pd.Series, bins: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Equal-width bin index of every value (-1 for missing) and the bin edges"""
+        numbers = values.to_numpy(dtype=float, na_value=np.nan)
+        finite = np.isfinite(numbers)
+        if not finite.any():
+            return np.full(len(numbers), -1, dtype=np.int32), np.linspace(0, 1, bins + 1)
+        low, high = numbers[finite].min(), numbers[finite].max()
+        if low == high:
+            low, high = low - 0.5, high + 0.5
+        edges = np.linspace(low, high, bins + 1)
+        with np.errstate(invalid="ignore"):
+            scaled = (numbers - low) * (bins / (high - low))
+            codes = np.clip(scaled, 0, bins - 1).astype(np.int32)
+        codes[~finite] = -1
+        return codes, edges
+
+    def pairwise_histograms(self, df: pd.DataFrame, columns: List[str],
+                            bins: int = 20) -> Tuple[np.ndarray, List[np.ndarray]]:
+        """2D histograms of every pair of columns, counts[i, j] binning columns[i] (rows) by columns[j]
+
+        Columns are binned once; each pair is then a single bincount over combined bin codes,
+        and the diagonal pairs hold the 1D histograms.
+        """
+        encoded = [self.bin_codes(df[col], bins) for col in columns]
+        edges = [e for _, e in encoded]
+        # Missing values go to an extra bin that is dropped at the end
+        codes = np.stack([np.where(c < 0, bins, c) for c, _ in encoded])
+
+        width = bins + 1
+        counts = np.zeros((len(columns), len(columns), bins, bins), dtype=np.int64)
+        for i in range(len(columns)):
+            scaled = codes[i] * width
+            for j in range(i + 1):
+                table = np.bincount(scaled + codes[j], minlength=width * width).reshape(width, width)[:bins, :bins]
+                counts[i, j] = table
+                counts[j, i] = table.T
+        return counts, edges
@@ -1,6 +1,7 @@
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse, FileResponse
+from pydantic import BaseModel
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -11,6 +12,9 @@ from plotly.utils import PlotlyJSONEncoder
 import json
 import io
 import base64
+import hashlib
+import re
+import threading
 from typing import List, Optional, Dict, Any
 import os
 from dotenv import load_dotenv
@@ -23,6 +27,16 @@ from sklearn.metrics import mean_squared_error, accuracy_score, classification_r
 from sklearn.cluster import KMeans
 from scipy import stats
 from logging import getLogger, DEBUG
+from data_query import DataQuery
+from aggregation_engine import AggregationEngine
+from excel_loader import ExcelWorkbook
+from json_loader import JsonLoader, NDJSON_EXTENSIONS
+from column_profiler import ColumnProfiler
+from report_exporter import ExportManager, EXPORT_EXTENSIONS, EXPORT_MEDIA_TYPES
+from statistical_tests import BatchTester
+from correlation_network import CorrelationNetwork
+from dataset_store import DatasetStore
+from upload_manager import UploadManager
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -75,6 +89,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# pyplot keeps global state; background exports render plots concurrently with requests
+PLOT_LOCK = threading.Lock()
+
+# Analysis results are kept for this many recently loaded datasets
+MAX_CACHED_DATASETS = 4
+
 # Configure Groq
 print(os.getenv("GROQ_API_KEY"))
 groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
@@ -82,32 +102,213 @@ groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
 class DataAnalyzer:
     def __init__(self):
         self.df = None
+        self.dataset_id = None
+        self.filename = None
+        self.compact_df = None
+        self.workbook = None
         self.analysis_results = {}
+        self.recent_datasets = []
+        self.aggregation_engine = AggregationEngine()
+        self.profiler = ColumnProfiler()
+        self.tester = BatchTester()
+        self.correlation_network = CorrelationNetwork()
+        self.store = None
     
-    def load_data(self, file_content: bytes, filename: str) -> Dict[str, Any]:
+    def load_data(self, file_content: bytes, filename: str, json_max_depth: int = 3) -> Dict[str, Any]:
         """Load data from uploaded file"""
+        content_hash = hashlib.sha256(file_content).hexdigest()[:16]
+        return self._load_stream(io.BytesIO(file_content), filename, content_hash, json_max_depth)
+    
+    def load_stored_file(self, path: str, filename: str, content_hash: str, json_max_depth: int = 3) -> Dict[str, Any]:
+        """Load a completed chunked upload, reusing the parsed dataset if the same content was loaded before"""
+        file_extension = filename.split('.')[-1].lower()
+        content_hash = content_hash[:16]
+        
+        # Workbooks are always reopened, since sheet selection needs the workbook itself
+        dataset_id = None
+        if file_extension == 'csv':
+            dataset_id = content_hash
+        elif file_extension in ['json'] + NDJSON_EXTENSIONS:
+            dataset_id = f"{content_hash}:depth{json_max_depth}"
+        
+        if dataset_id is not None and self._reuse_dataset(dataset_id, filename):
+            return {**self._load_summary(), "reused": True}
+        
+        with open(path, "rb") as stream:
+            return {**self._load_stream(stream, filename, content_hash, json_max_depth), "reused": False}
+    
+    def _reuse_dataset(self, dataset_id: str, filename: str) -> bool:
+        """Make an already parsed dataset active again without reading the file"""
+        if dataset_id == self.dataset_id and self.df is not None:
+            self.filename = filename
+            return True
+        if self.store is None:
+            return False
+        df = self.store.attach(dataset_id)
+        if df is None:
+            return False
+        self.df = df
+        self.workbook = None
+        self.filename = filename
+        self._set_dataset(dataset_id, shared=True)
+        return True
+    
+    def _load_stream(self, stream, filename: str, content_hash: str, json_max_depth: int = 3) -> Dict[str, Any]:
+        """Parse an uploaded file from a binary stream and make it the active dataset"""
         try:
             file_extension = filename.split('.')[-1].lower()
+            self.filename = filename
             
             if file_extension == 'csv':
-                self.df = pd.read_csv(io.BytesIO(file_content))
+                self.df = pd.read_csv(stream)
             elif file_extension in ['xlsx', 'xls']:
-                self.df = pd.read_excel(io.BytesIO(file_content))
-            elif file_extension == 'json':
-                self.df = pd.read_json(io.BytesIO(file_content))
+                # Only the first sheet is parsed now, the others on request via select_sheet
+                workbook = ExcelWorkbook(stream.read(), filename)
+                self.df = workbook.load_sheet()
+                self.workbook = workbook
+                self._set_dataset(f"{content_hash}:{workbook.sheet_names[0]}")
+                return self._load_summary()
+            elif file_extension in ['json'] + NDJSON_EXTENSIONS:
+                loader = JsonLoader(max_depth=json_max_depth)
+                self.df = loader.load(stream, file_extension)
+                # Flattening depth changes the columns, so it is part of the dataset identity
+                content_hash = f"{content_hash}:depth{json_max_depth}"
             else:
                 raise ValueError(f"Unsupported file format: {file_extension}")
             
-            return {
-                "success": True,
-                "message": f"Successfully loaded data with {len(self.df)} rows and {len(self.df.columns)} columns",
-                "shape": self.df.shape,
-                "columns": list(self.df.columns),
-                "data_types": self.df.dtypes.astype(str).to_dict()
-            }
+            self.workbook = None
+            self._set_dataset(content_hash)
+            
+            return self._load_summary()
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"Error loading file: {str(e)}")
     
+    def get_workbook(self) -> Optional[ExcelWorkbook]:
+        """The workbook of the active dataset, reopened from the dataset store if another worker loaded it"""
+        if self.workbook is None and self.store is not None and self.dataset_id is not None \
+                and (self.filename or "").split('.')[-1].lower() in ['xlsx', 'xls']:
+            content = self.store.workbook(self.dataset_id.split(':')[0])
+            if content is not None:
+                self.workbook = ExcelWorkbook(content, self.filename)
+        return self.workbook
+    
+    def select_sheet(self, sheet_name: str) -> Dict[str, Any]:
+        """Make another sheet of the uploaded workbook the active dataset"""
+        if self.get_workbook() is None:
+            raise HTTPException(status_code=400, detail="No Excel workbook loaded")
+        
+        dataset_id = f"{self.dataset_id.split(':')[0]}:{sheet_name}"
+        # A sheet that any worker has selected before is mapped from the store instead of parsed again
+        df = self.store.attach(dataset_id) if self.store is not None else None
+        self.df = df if df is not None else self.workbook.load_sheet(sheet_name)
+        self._set_dataset(dataset_id, shared=df is not None)
+        return self._load_summary()
+    
+    def _load_summary(self) -> Dict[str, Any]:
+        """Summarize the active dataset after loading"""
+        summary = {
+            "success": True,
+            "message": f"Successfully loaded data with {len(self.df)} rows and {len(self.df.columns)} columns",
+            "dataset_id": self.dataset_id,
+            "shape": self.df.shape,
+            "columns": list(self.df.columns),
+            "data_types": self.df.dtypes.astype(str).to_dict()
+        }
+        if self.workbook is not None:
+            summary["sheets"] = self.workbook.list_sheets()
+        return summary
+    
+    def _set_dataset(self, dataset_id: str, shared: bool = False):
+        """Register the freshly loaded dataframe and drop results cached for older datasets"""
+        if dataset_id != self.dataset_id:
+            self._retain_results(dataset_id)
+            if self.store is not None and self.dataset_id is not None:
+                self.store.release(self.dataset_id)
+        self.dataset_id = dataset_id
+        self.compact_df = None
+        
+        if self.store is not None:
+            # Write the dataset once and serve the memory-mapped copy, like every other worker
+            if not shared:
+                attached = self.store.attach(dataset_id) if self.store.put(dataset_id, self.df) else None
+                if attached is None:
+                    # Other workers cannot map this dataset, so they keep serving the one they have
+                    return
+                self.df = attached
+            if self.workbook is not None:
+                # Stored with its sheets, so other workers can open the remaining sheets
+                self.store.put_workbook(dataset_id.split(':')[0], self.workbook.file_content)
+            self.store.set_current(dataset_id, {"filename": self.filename})
+    
+    def _retain_results(self, dataset_id: str):
+        """Keep cached results of the few most recently used datasets, so switching back reuses them"""
+        recent = [d for d in self.recent_datasets if d != dataset_id][-(MAX_CACHED_DATASETS - 1):]
+        self.recent_datasets = recent + [dataset_id]
+        self.analysis_results = {
+            key: result for key, result in self.analysis_results.items() if key[0] in self.recent_datasets
+        }
+    
+    def sync_with_store(self):
+        """Switch to the dataset most recently loaded by any worker process"""
+        if self.store is None:
+            return
+        current = self.store.current()
+        if current is None or current["dataset_id"] == self.dataset_id:
+            return
+        
+        dataset_id = current["dataset_id"]
+        df = self.store.attach(dataset_id)
+        if df is None:
+            # e.g. evicted since it was published; keep serving the dataset this worker has
+            return
+        if self.dataset_id is not None:
+            self.store.release(self.dataset_id)
+        self.df = df
+        self.workbook = None
+        self.filename = current.get("filename")
+        self._retain_results(dataset_id)
+        self.dataset_id = dataset_id
+        self.compact_df = None
+    
+    def snapshot(self) -> "DataAnalyzer":
+        """Get an analyzer bound to the current dataset that later uploads do not affect"""
+        snapshot = DataAnalyzer()
+        snapshot.df = self.df
+        snapshot.dataset_id = self.dataset_id
+        snapshot.filename = self.filename
+        snapshot.compact_df = self.compact_df
+        # Results are keyed by dataset id, so the cache can be shared safely
+        snapshot.analysis_results = self.analysis_results
+        return snapshot
+    
+    def get_compact_df(self) -> pd.DataFrame:
+        """Get the loaded data with repetitive text columns stored as categoricals"""
+        if self.compact_df is None:
+            self.compact_df = self.aggregation_engine.compact(self.df)
+        return self.compact_df
+    
+    def cached_result(self, kind: str, spec: str, compute):
+        """Return a cached result for (dataset, kind, spec), computing it on first use"""
+        key = (self.dataset_id, kind, spec)
+        if key not in self.analysis_results:
+            self.analysis_results[key] = compute()
+        return self.analysis_results[key]
+    
+    def get_profile(self):
+        """Get the column profiles of the loaded data, computed once per dataset"""
+        if self.df is None:
+            raise HTTPException(status_code=400, detail="No data loaded")
+        
+        return self.cached_result("profile", "", lambda: self.profiler.profile(self.df))
+    
+    def profile_analysis(self) -> Dict[str, Any]:
+        """Get per-column profiles with distinct estimates, top values and quantiles"""
+        profiles = self.get_profile()
+        return self.cached_result("profile_summary", "", lambda: {
+            "total_rows": len(self.df),
+            **self.profiler.summary(profiles)
+        })
+    
     def basic_analysis(self) -> Dict[str, Any]:
         """Perform basic statistical analysis"""
 
@@ -119,21 +320,14 @@ class DataAnalyzer:
         logger.debug(f"Numeric columns: {numeric_cols}")
         logger.debug(f"Categorical columns: {categorical_cols}")
         
-        # Convert NumPy types to Python native types for JSON serialization
-        missing_values = self.df.isnull().sum().to_dict()
-        missing_values = {k: int(v) for k, v in missing_values.items()}
+        # Missing values, distinct counts and descriptive stats all come from the single-pass profile
+        profiles = self.get_profile()
+        missing_values = {col: profile.null_count for col, profile in profiles.items()}
+        distinct_values = {col: profile.distinct_estimate for col, profile in profiles.items()}
         
         memory_usage = int(self.df.memory_usage(deep=True).sum())
         
-        # Convert descriptive stats to native Python types
-        descriptive_stats = {}
-        if len(numeric_cols) > 0:
-            desc_df = self.df.describe()
-            for col in desc_df.columns:
-                descriptive_stats[col] = {
-                    stat: float(value) if pd.notna(value) else None 
-                    for stat, value in desc_df[col].items()
-                }
+        descriptive_stats = {col: profiles[col].describe() for col in numeric_cols}
         
         # Convert data preview to native Python types
         data_preview = []
@@ -157,6 +351,7 @@ class DataAnalyzer:
                 "numeric_columns": list(numeric_cols),
                 "categorical_columns": list(categorical_cols),
                 "missing_values": missing_values,
+                "distinct_values": distinct_values,
                 "memory_usage": memory_usage
             },
             "descriptive_stats": descriptive_stats,
@@ -177,16 +372,17 @@ class DataAnalyzer:
         correlation_matrix = self.df[numeric_cols].corr()
         
         # Create correlation heatmap
-        plt.figure(figsize=(10, 8))
-        sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0)
-        plt.title('Correlation Matrix')
-        
-        # Convert plot to base64 string
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', bbox_inches='tight', dpi=150)
-        buffer.seek(0)
-        plot_data = base64.b64encode(buffer.getvalue()).decode()
-        plt.close()
+        with PLOT_LOCK:
+            plt.figure(figsize=(10, 8))
+            sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0)
+            plt.title('Correlation Matrix')
+            
+            # Convert plot to base64 string
+            buffer = io.BytesIO()
+            plt.savefig(buffer, format='png', bbox_inches='tight', dpi=150)
+            buffer.seek(0)
+            plot_data = base64.b64encode(buffer.getvalue()).decode()
+            plt.close()
         
         # Convert correlation matrix to native Python types
         correlation_dict = {}
@@ -202,6 +398,14 @@ class DataAnalyzer:
             "strong_correlations": self._find_strong_correlations(correlation_matrix)
         }
     
+    def correlation_network_analysis(self, threshold: float = 0.5) -> Dict[str, Any]:
+        """Build the network of correlated columns with community assignments and a stable layout"""
+        if self.df is None:
+            raise HTTPException(status_code=400, detail="No data loaded")
+        
+        # Only the layout is cached, inside the network helper, so layout_cached reports whether it was reused
+        return self.correlation_network.analyze(self.df, threshold, self.dataset_id)
+    
     def _find_strong_correlations(self, corr_matrix, threshold=0.7):
         """Find strong correlations"""
         strong_corr = []
@@ -353,8 +557,44 @@ class DataAnalyzer:
             "visualization": cluster_plot
         }
 
+    def aggregate(self, group_by: List[str], aggregations: Optional[List[str]] = None,
+                  pivot: Optional[str] = None, top_n: Optional[int] = None) -> Dict[str, Any]:
+        """Perform a group-by aggregation, optionally pivoted"""
+        if self.df is None:
+            raise HTTPException(status_code=400, detail="No data loaded")
+        
+        spec = self.aggregation_engine.spec_key(group_by, aggregations, pivot, top_n)
+        return self.cached_result("aggregate", spec, lambda: self.aggregation_engine.aggregate(
+            self.get_compact_df(), group_by, aggregations, pivot, top_n
+        ))
+
+    def statistical_tests(self, test: str, group_column: Optional[str] = None, columns: Optional[List[str]] = None,
+                          correction: str = "fdr_bh", alpha: float = 0.05) -> Dict[str, Any]:
+        """Run a family of hypothesis tests across many columns"""
+        if self.df is None:
+            raise HTTPException(status_code=400, detail="No data loaded")
+        
+        spec = json.dumps([test, group_column, columns, correction, alpha])
+        return self.cached_result("tests", spec, lambda: self.tester.run(
+            self.df, test, group_column, columns, correction, alpha
+        ))
+
 # Initialize analyzer
 analyzer = DataAnalyzer()
+analyzer.store = DatasetStore()
+export_manager = ExportManager()
+upload_manager = UploadManager()
+data_query = DataQuery()
+
+@app.middleware("http")
+async def sync_dataset(request, call_next):
+    """Serve the dataset most recently loaded by any worker, so no sticky sessions are needed"""
+    analyzer.sync_with_store()
+    return await call_next(request)
+
+@app.on_event("shutdown")
+async def release_datasets():
+    analyzer.store.close()
 
 @app.get("/", tags=["General"])
 async def root():
@@ -366,7 +606,7 @@ async def root():
     return {"message": "StatM8 Data Analytics API", "version": "1.0.0"}
 
 @app.post("/upload", tags=["Data Management"])
-async def upload_file(file: UploadFile = File(...)):
+async def upload_file(file: UploadFile = File(...), json_max_depth: int = Form(3)):
     """
     ## Upload Data File
     
@@ -375,10 +615,15 @@ async def upload_file(file: UploadFile = File(...)):
     **Supported formats:**
     - CSV (.csv)
     - Excel (.xlsx, .xls)
-    - JSON (.json)
+    - JSON (.json), either a single document or newline-delimited
+    - Newline-delimited JSON (.ndjson, .jsonl)
+    
+    Nested JSON objects are flattened into dotted columns (e.g. `user.address.city`) up to
+    `json_max_depth` levels (default: 3); deeper objects and arrays are kept as JSON text.
     
     **Returns:**
     - Success status
+    - `dataset_id`: Id of the loaded dataset, e.g. the `csv_id` for `/export`
     - Dataset shape (rows, columns)
     - Column names and data types
     - Basic file information
@@ -388,6 +633,7 @@ async def upload_file(file: UploadFile = File(...)):
     {
         "success": true,
         "message": "Successfully loaded data with 150 rows and 5 columns",
+        "dataset_id": "9c1e5b7a0d2f4e61",
         "shape": [150, 5],
         "columns": ["sepal_length", "sepal_width", "petal_length", "petal_width", "species"],
         "data_types": {"sepal_length": "float64", "species": "object"}
@@ -396,7 +642,161 @@ async def upload_file(file: UploadFile = File(...)):
     """
     try:
         content = await file.read()
-        result = analyzer.load_data(content, file.filename)
+        result = analyzer.load_data(content, file.filename, json_max_depth)
+        return JSONResponse(content=result)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/upload/init", tags=["Data Management"])
+async def init_upload(
+    filename: str = Form(...),
+    total_size: Optional[int] = Form(None),
+    sha256: Optional[str] = Form(None)
+):
+    """
+    ## Start Chunked Upload
+    
+    Start a resumable upload for large files. Send the file in parts to
+    `/upload/{upload_id}/parts/{part_number}` (numbered from 1, any order, any size), then call
+    `/upload/{upload_id}/complete`. Upload sessions are kept on disk, so an interrupted upload
+    resumes by sending only the parts that `/upload/{upload_id}` does not list.
+    
+    **Parameters:**
+    - `filename`: Original file name; its extension selects the parser
+    - `total_size` (optional): File size in bytes, checked on completion
+    - `sha256` (optional): SHA-256 of the whole file. When the server already has this content,
+      `duplicate` is `true` and `challenge` names a byte range of the file. Completing with
+      `proof` = SHA-256 of the `nonce` followed by those bytes skips sending the parts.
+    
+    **Example Response:**
+    ```json
+    {
+        "upload_id": "5b0f8d1c2e3a4b5c6d7e8f9001122334", "filename": "sensors.csv",
+        "total_size": 2147483648, "sha256": null, "created_at": "2024-05-01T10:00:00+00:00",
+        "challenge": null, "duplicate": false
+    }
+    ```
+    """
+    try:
+        return JSONResponse(content=upload_manager.init(filename, total_size, sha256))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/upload/{upload_id}/parts/{part_number}", tags=["Data Management"])
+async def upload_part(upload_id: str, part_number: int, part: UploadFile = File(...)):
+    """
+    ## Upload Part
+    
+    Upload one part of a chunked upload. Part numbers run from 1 to 10000; sending a part number
+    again replaces that part.
+    
+    **Example Response:**
+    ```json
+    {"part_number": 1, "size": 67108864, "sha256": "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08"}
+    ```
+    """
+    async def chunks():
+        while True:
+            chunk = await part.read(1024 * 1024)
+            if not chunk:
+                break
+            yield chunk
+    
+    try:
+        return JSONResponse(content=await upload_manager.write_part(upload_id, part_number, chunks()))
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Upload '{upload_id}' not found")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/upload/{upload_id}", tags=["Data Management"])
+async def upload_status(upload_id: str):
+    """
+    ## Chunked Upload Status
+    
+    List the parts received so far, with their sizes and hashes, and any gaps in the part numbers.
+    """
+    try:
+        return JSONResponse(content=upload_manager.status(upload_id))
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Upload '{upload_id}' not found")
+
+@app.post("/upload/{upload_id}/complete", tags=["Data Management"])
+async def complete_upload(upload_id: str, json_max_depth: int = Form(3), proof: Optional[str] = Form(None)):
+    """
+    ## Complete Chunked Upload
+    
+    Join the parts, store the file by its content hash and load it. If the same content was loaded
+    before, the already parsed dataset and its cached analyses are reused (`reused: true`).
+    A duplicate upload without parts needs `proof`, the answer to the challenge from `/upload/init`.
+    
+    **Returns:** The same summary as `/upload`, plus `content_hash` and `reused`
+    """
+    try:
+        session, content_hash = upload_manager.complete(upload_id, proof)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Upload '{upload_id}' not found")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        result = analyzer.load_stored_file(upload_manager.blob_path(content_hash), session["filename"],
+                                           content_hash, json_max_depth)
+        return JSONResponse(content={**result, "content_hash": content_hash})
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.delete("/upload/{upload_id}", tags=["Data Management"])
+async def abort_upload(upload_id: str):
+    """Discard a chunked upload and its parts"""
+    try:
+        upload_manager.abort(upload_id)
+        return JSONResponse(content={"success": True})
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Upload '{upload_id}' not found")
+
+@app.get("/data/sheets", tags=["Data Management"])
+async def list_sheets():
+    """
+    ## List Workbook Sheets
+    
+    List the sheets of the uploaded Excel workbook with their dimensions. Sheet sizes are read from
+    the workbook metadata, so sheets that have not been selected yet are never parsed.
+    
+    **Example Response:**
+    ```json
+    {
+        "sheets": [
+            {"name": "Sales", "index": 0, "rows": 120001, "columns": 14, "loaded": true},
+            {"name": "Returns", "index": 1, "rows": 8200, "columns": 9, "loaded": false}
+        ],
+        "engine": "calamine"
+    }
+    ```
+    """
+    try:
+        workbook = analyzer.get_workbook()
+        if workbook is None:
+            raise HTTPException(status_code=400, detail="No Excel workbook loaded")
+        return JSONResponse(content={
+            "sheets": workbook.list_sheets(),
+            "engine": workbook.engine
+        })
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/data/sheets/select", tags=["Data Management"])
+async def select_sheet(sheet_name: str = Form(...)):
+    """
+    ## Select Workbook Sheet
+    
+    Make another sheet of the uploaded Excel workbook the active dataset. Each sheet is parsed at most
+    once; switching back to a sheet reuses the already loaded data.
+    
+    **Returns:** The same summary as `/upload` for the selected sheet
+    """
+    try:
+        result = analyzer.select_sheet(sheet_name)
         return JSONResponse(content=result)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -441,11 +841,72 @@ async def basic_analysis():
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.get("/analyze/profile", tags=["Data Analysis"])
+async def profile_analysis():
+    """
+    ## Column Profile
+    
+    Profile every column of the uploaded dataset in a single pass. Distinct counts, top values and
+    quantiles are computed with mergeable sketches, so they are estimates on large data
+    (about 1% relative error for quantiles and distinct counts).
+    
+    **Example Response:**
+    ```json
+    {
+        "total_rows": 150,
+        "columns": [
+            {
+                "name": "sepal_length", "dtype": "float64", "kind": "numeric", "inferred_type": "floating",
+                "count": 150, "null_count": 0, "distinct_estimate": 35,
+                "min": 4.3, "max": 7.9, "mean": 5.84, "std": 0.83, "skewness": 0.31, "kurtosis": -0.57,
+                "quantiles": {"1%": 4.4, "5%": 4.6, "25%": 5.1, "50%": 5.8, "75%": 6.4, "95%": 7.3, "99%": 7.7}
+            },
+            {
+                "name": "species", "dtype": "object", "kind": "categorical", "inferred_type": "string",
+                "count": 150, "null_count": 0, "distinct_estimate": 3,
+                "top_values": [{"value": "setosa", "count": 50}], "top_values_max_error": 0
+            }
+        ]
+    }
+    ```
+    """
+    try:
+        result = analyzer.profile_analysis()
+        return JSONResponse(content=result)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.get("/analyze/correlation")
 async def correlation_analysis():
     """Get correlation analysis"""
     try:
-        result = analyzer.correlation_analysis()
+        result = analyzer.cached_result("correlation", "", analyzer.correlation_analysis)
+        return JSONResponse(content=result)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/analyze/correlation/network", tags=["Data Analysis"])
+async def correlation_network_analysis(threshold: float = 0.5):
+    """
+    ## Correlation Network
+    
+    Network of numeric columns linked by correlations with |r| > `threshold`, with Louvain
+    community assignments and a deterministic layout. Layouts are cached per dataset and threshold.
+    Wide tables are laid out community by community, and only the strongest 5000 edges are kept.
+    
+    **Example Response:**
+    ```json
+    {
+        "threshold": 0.5, "layout": "spring", "layout_cached": false,
+        "n_nodes": 4, "n_edges": 3, "edges_truncated": false,
+        "nodes": [{"name": "petal_length", "x": 0.12, "y": -0.4, "community": 0, "degree": 3}],
+        "edges": [{"source": "sepal_length", "target": "petal_length", "correlation": 0.87175}],
+        "communities": [{"community": 0, "size": 3, "columns": ["sepal_length", "petal_length", "petal_width"]}]
+    }
+    ```
+    """
+    try:
+        result = analyzer.correlation_network_analysis(threshold)
         return JSONResponse(content=result)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -454,7 +915,7 @@ async def correlation_analysis():
 async def generate_visualizations(chart_type: str = "auto"):
     """Generate data visualizations"""
     try:
-        result = analyzer.generate_visualizations(chart_type)
+        result = analyzer.cached_result("visualize", chart_type, lambda: analyzer.generate_visualizations(chart_type))
         return JSONResponse(content=result)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -463,7 +924,8 @@ async def generate_visualizations(chart_type: str = "auto"):
 async def ml_analysis(target_column: str = Form(...), task_type: str = Form("auto")):
     """Perform machine learning analysis"""
     try:
-        result = analyzer.perform_ml_analysis(target_column, task_type)
+        result = analyzer.cached_result("ml", f"{target_column}|{task_type}",
+                                        lambda: analyzer.perform_ml_analysis(target_column, task_type))
         return JSONResponse(content=result)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -472,7 +934,46 @@ async def ml_analysis(target_column: str = Form(...), task_type: str = Form("aut
 async def clustering_analysis(n_clusters: int = Form(3)):
     """Perform clustering analysis"""
     try:
-        result = analyzer.clustering_analysis(n_clusters)
+        result = analyzer.cached_result("clustering", str(n_clusters), lambda: analyzer.clustering_analysis(n_clusters))
+        return JSONResponse(content=result)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/analyze/tests", tags=["Data Analysis"])
+async def statistical_tests(
+    test: str = Form(...),
+    group_column: Optional[str] = Form(None),
+    columns: Optional[List[str]] = Form(None),
+    correction: str = Form("fdr_bh"),
+    alpha: float = Form(0.05)
+):
+    """
+    ## Batch Hypothesis Testing
+    
+    Run one test family across many columns at once, with multiple-comparison correction.
+    
+    **Parameters:**
+    - `test`: `anova`, `kruskal` or `ttest` (every numeric column across the groups of `group_column`;
+      `ttest` runs Welch t-tests for every pair of groups), or `chi2` (every pair of categorical columns)
+    - `group_column`: Grouping column, required for all tests except `chi2`
+    - `columns` (optional, repeatable): Columns to test (default: all numeric, or all categorical for `chi2`)
+    - `correction` (optional): `fdr_bh` (default), `holm`, `bonferroni` or `none`
+    - `alpha` (optional): Significance level applied to the adjusted p-values (default: 0.05)
+    
+    **Example Response:**
+    ```json
+    {
+        "test": "anova", "group_column": "species", "correction": "fdr_bh", "alpha": 0.05,
+        "effect_size": "eta_squared", "n_tests": 4, "n_significant": 4,
+        "results": [
+            {"column": "petal_length", "statistic": 1180.16, "p_value": 2.86e-91, "df": [2, 147],
+             "effect_size": 0.941, "n": 150, "p_adjusted": 1.14e-90, "significant": true}
+        ]
+    }
+    ```
+    """
+    try:
+        result = analyzer.statistical_tests(test, group_column, columns, correction, alpha)
         return JSONResponse(content=result)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -500,7 +1001,7 @@ async def ai_query(query: str = Form(...), context: str = Form("general")):
         {analyzer.df.head().to_string()}
         
         Descriptive statistics:
-        {analyzer.df.describe().to_string() if len(basic_info['basic_info']['numeric_columns']) > 0 else 'No numeric columns for statistics'}
+        {pd.DataFrame(basic_info['descriptive_stats']).to_string() if len(basic_info['basic_info']['numeric_columns']) > 0 else 'No numeric columns for statistics'}
         """
         
         # Create AI prompt
@@ -553,7 +1054,8 @@ async def get_data_sample(rows: int = 10):
         if analyzer.df is None:
             raise HTTPException(status_code=400, detail="No data loaded")
         
-        sample_data = analyzer.df.head(rows).to_dict('records')
+        page, _ = data_query.query(analyzer.df, offset=0, limit=rows)
+        sample_data = json.loads(data_query.to_json_records(page))
         return JSONResponse(content={
             "sample_data": sample_data,
             "total_rows": len(analyzer.df),
@@ -562,6 +1064,239 @@ async def get_data_sample(rows: int = 10):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.get("/data/aggregate", tags=["Data Analysis"])
+async def aggregate_data(
+    group_by: List[str] = Query(...),
+    agg: Optional[List[str]] = Query(None),
+    pivot: Optional[str] = None,
+    top_n: Optional[int] = None
+):
+    """
+    ## Group-by Aggregation
+    
+    Aggregate the loaded dataset on the server so that grouped views only transfer one row per group.
+    
+    **Query Parameters:**
+    - `group_by`: Repeatable, columns to group by
+    - `agg`: Repeatable `func:column` aggregates (default: `count`).
+      Functions: `count`, `sum`, `mean`, `median`, `min`, `max`, `std`, `distinct`, and quantiles as `p<percentile>` (e.g. `p90:price`)
+    - `pivot` (optional): Column whose values become output columns
+    - `top_n` (optional): Keep only the N largest groups by row count
+    
+    **Example:** `/data/aggregate?group_by=species&agg=count&agg=mean:sepal_length&agg=p90:petal_width`
+    
+    **Example Response:**
+    ```json
+    {
+        "group_by": ["species"],
+        "aggregations": ["count", "mean_sepal_length", "p90_petal_width"],
+        "pivot": null,
+        "total_groups": 3,
+        "returned_groups": 3,
+        "columns": ["species", "count", "mean_sepal_length", "p90_petal_width"],
+        "data": [{"species": "setosa", "count": 50, "mean_sepal_length": 5.006, "p90_petal_width": 0.4}]
+    }
+    ```
+    """
+    try:
+        result = analyzer.aggregate(group_by, agg, pivot, top_n)
+        return JSONResponse(content=result)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+MAX_JSON_PAGE_ROWS = 10000
+
+@app.get("/data/rows", tags=["Data Management"])
+async def get_data_rows(
+    offset: int = 0,
+    limit: int = 100,
+    columns: Optional[List[str]] = Query(None),
+    filter: Optional[List[str]] = Query(None),
+    sort: Optional[List[str]] = Query(None),
+    format: str = "json"
+):
+    """
+    ## Query Data Rows
+    
+    Page through the loaded dataset with column projection, filtering and sorting.
+    
+    **Query Parameters:**
+    - `offset`, `limit`: Page window (JSON pages are capped at 10000 rows; `limit=0` streams to the end)
+    - `columns`: Repeatable, columns to return (default: all)
+    - `filter`: Repeatable `column:op:value` predicates combined with AND.
+      Operators: `eq`, `ne`, `gt`, `ge`, `lt`, `le`, `in` (values separated by `|`), `contains`, `isnull`, `notnull`
+    - `sort`: Repeatable column names, prefix with `-` for descending
+    - `format`: `json` (default), `ndjson` (streamed) or `arrow` (streamed Arrow IPC)
+    
+    **Example:** `/data/rows?offset=100&limit=50&columns=species&columns=sepal_length&filter=sepal_length:gt:5&sort=-sepal_length`
+    """
+    try:
+        if analyzer.df is None:
+            raise HTTPException(status_code=400, detail="No data loaded")
+        
+        if format == "json":
+            if limit <= 0 or limit > MAX_JSON_PAGE_ROWS:
+                raise ValueError(f"limit must be between 1 and {MAX_JSON_PAGE_ROWS} for JSON pages, use format=ndjson or format=arrow for larger reads")
+        elif format not in DataQuery.STREAM_FORMATS:
+            raise ValueError(f"Unsupported format: {format}")
+        
+        page, total = data_query.query(analyzer.df, columns=columns, filters=filter, sort=sort,
+                                       offset=offset, limit=limit if limit > 0 else None)
+        headers = {"X-Total-Rows": str(total), "X-Offset": str(offset)}
+        
+        if format == "ndjson":
+            return StreamingResponse(data_query.iter_ndjson(page), media_type="application/x-ndjson", headers=headers)
+        if format == "arrow":
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise ValueError("Arrow output requires pyarrow to be installed")
+            return StreamingResponse(data_query.iter_arrow_ipc(page), media_type="application/vnd.apache.arrow.stream", headers=headers)
+        
+        return Response(content=data_query.page_response(page, total, offset), media_type="application/json", headers=headers)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+class ExportRequest(BaseModel):
+    csv_id: Optional[str] = None
+    uid: Optional[str] = None
+    vlm_analysis_id: Optional[str] = None
+    title: Optional[str] = None
+    format: str = "zip"
+    include_summary: bool = True
+    include_plots: bool = True
+    include_ml: bool = True
+    include_code: bool = False
+    target_column: Optional[str] = None
+    task_type: str = "auto"
+    n_clusters: int = 3
+
+def _check_export_dataset(csv_id: Optional[str]):
+    """Make sure an export request refers to the loaded dataset"""
+    if analyzer.df is None:
+        raise HTTPException(status_code=400, detail="No data loaded")
+    # Other ids are the client's own id for the file it uploaded, and label the loaded dataset
+    if csv_id and csv_id != analyzer.dataset_id and re.fullmatch(r"[0-9a-f]{16}(:.+)?", csv_id):
+        raise HTTPException(status_code=400, detail=f"Dataset '{csv_id}' is not loaded")
+
+@app.post("/export", tags=["Export"])
+async def create_export(request: ExportRequest):
+    """
+    ## Export Analysis Report
+    
+    Start rendering a full analysis report for the loaded dataset in a background worker.
+    Analyses already computed through the other endpoints are reused from the cache.
+    
+    **Request Body (JSON):**
+    - `csv_id` (optional): The `dataset_id` returned by `/upload`, or the client's own id for the uploaded
+      file; exports are listed under this id (default: loaded dataset)
+    - `uid` (optional): User id, used to filter `/export/csv/{csv_id}`
+    - `title` (optional): Report title
+    - `format`: `pdf` (static report), `markdown` or `latex` (ZIP with the report source, chart files and
+      results JSON), `zip` (HTML report, results JSON and chart files) or `html` (single self-contained page)
+    - `include_summary`, `include_plots`, `include_ml`: Sections to include (default: all)
+    - `include_code`: Add Python snippets that reproduce the included sections (default: false)
+    - `target_column` (optional): Target for the machine learning section
+    - `task_type`, `n_clusters`: Options for the ML and clustering sections
+    
+    **Returns:** The export job; poll `/export/jobs/{export_id}` until `status` is `completed`,
+    then download from `download_url`.
+    """
+    try:
+        _check_export_dataset(request.csv_id)
+        options = {**request.dict(), "csv_name": analyzer.filename}
+        job = export_manager.submit(analyzer.snapshot(), options)
+        return JSONResponse(content=job)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/export/status/{csv_id}", tags=["Export"])
+async def export_status(csv_id: str, uid: Optional[str] = None):
+    """
+    ## Export Readiness
+    
+    Tell whether a report can be exported for a dataset, and which analyses it would reuse.
+    
+    **Example Response:**
+    ```json
+    {
+        "csv_id": "9c1e5b7a0d2f4e61", "csv_name": "iris.csv", "has_summary": true, "has_plots": true,
+        "plot_count": 4, "has_vlm_analysis": false, "can_export": true
+    }
+    ```
+    """
+    try:
+        _check_export_dataset(csv_id)
+    except HTTPException:
+        return JSONResponse(content={"csv_id": csv_id, "csv_name": None, "has_summary": False, "has_plots": False,
+                                     "plot_count": 0, "has_vlm_analysis": False, "can_export": False})
+    
+    plots = analyzer.analysis_results.get((analyzer.dataset_id, "visualize", "auto"), {}).get("visualizations", {})
+    heatmap = analyzer.analysis_results.get((analyzer.dataset_id, "correlation", ""), {}).get("heatmap")
+    plot_count = len(plots) + (1 if heatmap else 0)
+    return JSONResponse(content={
+        "csv_id": csv_id,
+        "csv_name": analyzer.filename,
+        # The summary section comes from the column profile, so it is available for every loaded dataset
+        "has_summary": True,
+        "has_plots": plot_count > 0,
+        "plot_count": plot_count,
+        "has_vlm_analysis": False,
+        "can_export": True
+    })
+
+@app.get("/export/jobs/{export_id}", tags=["Export"])
+async def export_job(export_id: str):
+    """
+    ## Export Job Status
+    
+    Get the progress of an export job.
+    
+    **Example Response:**
+    ```json
+    {
+        "export_id": "3f2a...", "csv_id": "9c1e5b7a0d2f4e61", "csv_name": "iris.csv", "format": "pdf",
+        "is_zip": false, "status": "running", "stage": "clustering", "progress": 0.667,
+        "sections_included": [], "total_plots": 0, "download_url": null
+    }
+    ```
+    """
+    try:
+        return JSONResponse(content=export_manager.public(export_manager.get(export_id)))
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Export '{export_id}' not found")
+
+@app.get("/export/csv/{csv_id}", tags=["Export"])
+async def list_exports(csv_id: str, request: Request, uid: Optional[str] = None, limit: int = 20):
+    """
+    ## List Exports
+    
+    List the most recent completed exports of a dataset, optionally only those of one user.
+    `cloudinary_url` is the absolute download URL of each export.
+    """
+    jobs = export_manager.list_for_dataset(csv_id, uid, limit)
+    exports = [export_manager.export_item(job, str(request.base_url)) for job in jobs]
+    return JSONResponse(content={"csv_id": csv_id, "uid": uid, "exports": exports, "total": len(exports)})
+
+@app.get("/export/download/{export_id}", tags=["Export"])
+async def download_export(export_id: str):
+    """Stream a finished export from disk"""
+    try:
+        job = export_manager.get(export_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Export '{export_id}' not found")
+    if job["status"] != "completed":
+        raise HTTPException(status_code=400, detail=f"Export is {job['status']}")
+    
+    extension = EXPORT_EXTENSIONS[job["format"]]
+    name = os.path.splitext(job["csv_name"] or job["dataset_id"])[0]
+    # PDFs open inline so the client can show them in its viewer
+    return FileResponse(job["path"], media_type=EXPORT_MEDIA_TYPES[extension],
+                        filename=f"{name}_{job['format']}_export.{extension}",
+                        content_disposition_type="inline" if extension == "pdf" else "attachment")
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # Workers share uploaded datasets through the dataset store
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    uvicorn.run("app:app" if workers > 1 else app, host="0.0.0.0", port=8000, workers=workers)
\ No newline at end of file
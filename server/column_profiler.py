@@ -0,0 +1,414 @@
+from typing import Dict, List, Any, Optional
+import pandas as pd
+import numpy as np
+import math
+
+
+def _native(value):
+    """Convert NumPy scalars to plain Python values for JSON responses"""
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+class HyperLogLog:
+    """Mergeable distinct-count estimator over 64-bit hashes"""
+
+    def __init__(self, precision: int = 14):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def _bit_length(self, values: np.ndarray) -> np.ndarray:
+        """Number of significant bits of each uint64, computed on exact 32-bit halves"""
+        high = (values >> np.uint64(32)).astype(np.float64)
+        low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+        with np.errstate(divide="ignore"):
+            high_bits = np.where(high > 0, np.floor(np.log2(high)) + 33, 0)
+            low_bits = np.where(low > 0, np.floor(np.log2(low)) + 1, 0)
+        return np.where(high > 0, high_bits, low_bits).astype(np.int64)
+
+    def update(self, hashes: np.ndarray):
+        if len(hashes) == 0:
+            return
+        width = 64 - self.precision
+        index = (hashes >> np.uint64(width)).astype(np.int64)
+        remainder = hashes & np.uint64((1 << width) - 1)
+        rank = width - self._bit_length(remainder) + 1
+        # Sorting (index, rank) pairs puts the highest rank of every register last
+        combined = np.unique(index * 64 + rank)
+        registers = combined >> 6
+        last = np.append(registers[1:] != registers[:-1], True)
+        registers, rank = registers[last], (combined & 63)[last].astype(np.uint8)
+        self.registers[registers] = np.maximum(self.registers[registers], rank)
+
+    def merge(self, other: "HyperLogLog"):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros > 0:
+            # Linear counting is more accurate for small cardinalities
+            return int(round(m * math.log(m / zeros)))
+        return int(round(raw))
+
+
+class HeavyHitters:
+    """Mergeable Misra-Gries summary of the most frequent values.
+
+    Counts are exact while the column has at most `capacity` distinct values. Beyond that every
+    kept count is a lower bound and the true count is at most `max_error` higher.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=np.int64)
+        self.max_error = 0
+
+    def _combine(self, counts: pd.Series, max_error: int):
+        if len(self.counts):
+            counts = pd.concat([self.counts, counts]).groupby(level=0, sort=False, observed=True).sum()
+        self.max_error += max_error
+        if len(counts) > self.capacity:
+            # Subtracting the (capacity + 1)-th largest count leaves at most `capacity` values
+            threshold = int(counts.nlargest(self.capacity + 1).iloc[-1])
+            counts = counts[counts > threshold] - threshold
+            self.max_error += threshold
+        self.counts = counts.astype(np.int64)
+
+    def update(self, values: pd.Series):
+        value_counts = values.value_counts(sort=False)
+        self._combine(value_counts[value_counts > 0], 0)
+
+    def merge(self, other: "HeavyHitters"):
+        self._combine(other.counts, other.max_error)
+
+    @property
+    def exact(self) -> bool:
+        return self.max_error == 0
+
+    def top(self, k: Optional[int] = None) -> List[Dict[str, Any]]:
+        ranked = self.counts.sort_values(ascending=False, kind="stable")
+        return [{"value": _native(value), "count": int(count)} for value, count in ranked.iloc[:k].items()]
+
+
+class MomentSketch:
+    """Mergeable count, min/max and central moments up to the fourth order"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+        self.min = None
+        self.max = None
+
+    def update(self, values: np.ndarray):
+        if len(values) == 0:
+            return
+        chunk = MomentSketch()
+        chunk.count = len(values)
+        chunk.mean = float(values.mean())
+        deviations = values - chunk.mean
+        squared = deviations * deviations
+        chunk.m2 = float(squared.sum())
+        chunk.m3 = float((squared * deviations).sum())
+        chunk.m4 = float((squared * squared).sum())
+        chunk.min = float(values.min())
+        chunk.max = float(values.max())
+        self.merge(chunk)
+
+    def merge(self, other: "MomentSketch"):
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.__dict__.update(other.__dict__)
+            return
+
+        na, nb = self.count, other.count
+        n = na + nb
+        delta = other.mean - self.mean
+        m2 = self.m2 + other.m2 + delta ** 2 * na * nb / n
+        m3 = (self.m3 + other.m3 + delta ** 3 * na * nb * (na - nb) / n ** 2
+              + 3 * delta * (na * other.m2 - nb * self.m2) / n)
+        m4 = (self.m4 + other.m4 + delta ** 4 * na * nb * (na * na - na * nb + nb * nb) / n ** 3
+              + 6 * delta ** 2 * (na * na * other.m2 + nb * nb * self.m2) / n ** 2
+              + 4 * delta * (na * other.m3 - nb * self.m3) / n)
+
+        self.mean += delta * nb / n
+        self.m2, self.m3, self.m4 = m2, m3, m4
+        self.count = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def std(self) -> Optional[float]:
+        if self.count < 2:
+            return None
+        return math.sqrt(self.m2 / (self.count - 1))
+
+    def skewness(self) -> Optional[float]:
+        if self.count < 3 or self.m2 == 0:
+            return None
+        return math.sqrt(self.count) * self.m3 / self.m2 ** 1.5
+
+    def kurtosis(self) -> Optional[float]:
+        if self.count < 4 or self.m2 == 0:
+            return None
+        return self.count * self.m4 / self.m2 ** 2 - 3
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch with logarithmic buckets and bounded relative error.
+
+    Small columns also keep their raw values, so their quantiles are exact.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-9, exact_limit: int = 10000):
+        self.relative_accuracy = relative_accuracy
+        self.exact_limit = exact_limit
+        self.exact_values = []
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.min_value = min_value
+        self.positive = {}
+        self.negative = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def _add_keys(self, store: Dict[int, int], magnitudes: np.ndarray):
+        keys, counts = np.unique(np.ceil(np.log(magnitudes) / self.log_gamma).astype(np.int64), return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            store[key] = store.get(key, 0) + count
+
+    def update(self, values: np.ndarray):
+        if len(values) == 0:
+            return
+        magnitudes = np.abs(values)
+        tiny = magnitudes < self.min_value
+        self.zero_count += int(tiny.sum())
+        self._add_keys(self.positive, values[~tiny & (values > 0)])
+        self._add_keys(self.negative, -values[~tiny & (values < 0)])
+        self.count += len(values)
+        self._keep_exact([values])
+
+    def merge(self, other: "QuantileSketch"):
+        for store, other_store in [(self.positive, other.positive), (self.negative, other.negative)]:
+            for key, count in other_store.items():
+                store[key] = store.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self._keep_exact(other.exact_values)
+
+    def _keep_exact(self, arrays: Optional[List[np.ndarray]]):
+        if self.exact_values is None or arrays is None or self.count > self.exact_limit:
+            self.exact_values = None
+        else:
+            self.exact_values = self.exact_values + list(arrays)
+
+    def _bucket_value(self, key: int) -> float:
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        if self.exact_values is not None:
+            return float(np.quantile(np.concatenate(self.exact_values), q))
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._bucket_value(key)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        value = 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            value = self._bucket_value(key)
+            if seen > rank:
+                break
+        return value
+
+
+class ColumnProfile:
+    """Mergeable summary of one column"""
+
+    def __init__(self, name: str, dtype: str, kind: str, top_k: int = 10):
+        self.name = name
+        self.dtype = dtype
+        self.kind = kind
+        self.top_k = top_k
+        self.row_count = 0
+        self.null_count = 0
+        self.inferred_type = None
+        self.tz = None
+        self.distinct = HyperLogLog()
+        self.heavy_hitters = HeavyHitters(capacity=max(top_k * 100, 1000))
+        self.moments = MomentSketch() if kind in ["numeric", "datetime", "timedelta"] else None
+        self.quantiles = QuantileSketch() if kind in ["numeric", "timedelta"] else None
+
+    def update(self, series: pd.Series):
+        """Fold one chunk of the column into the profile"""
+        self.row_count += len(series)
+        values = series.dropna()
+        self.null_count += len(series) - len(values)
+        if len(values) == 0:
+            return
+
+        if self.inferred_type is None:
+            self.inferred_type = pd.api.types.infer_dtype(values.head(1000), skipna=True)
+
+        self.distinct.update(pd.util.hash_pandas_object(values, index=False).to_numpy())
+
+        if self.kind == "numeric":
+            numbers = values.to_numpy(dtype=np.float64)
+            self.moments.update(numbers)
+            self.quantiles.update(numbers)
+        elif self.kind == "datetime":
+            # Stored as UTC nanoseconds; the zone is restored when reporting
+            self.tz = values.dt.tz
+            self.moments.update(values.dt.as_unit("ns").astype("int64").to_numpy(dtype=np.float64))
+        elif self.kind == "timedelta":
+            nanoseconds = values.dt.as_unit("ns").astype("int64").to_numpy(dtype=np.float64)
+            self.moments.update(nanoseconds)
+            self.quantiles.update(nanoseconds)
+        else:
+            self.heavy_hitters.update(values)
+
+    def merge(self, other: "ColumnProfile"):
+        """Combine the profile of another chunk of the same column"""
+        self.row_count += other.row_count
+        self.null_count += other.null_count
+        self.inferred_type = self.inferred_type or other.inferred_type
+        self.tz = self.tz or other.tz
+        self.distinct.merge(other.distinct)
+        self.heavy_hitters.merge(other.heavy_hitters)
+        if self.moments is not None:
+            self.moments.merge(other.moments)
+        if self.quantiles is not None:
+            self.quantiles.merge(other.quantiles)
+
+    @property
+    def non_null_count(self) -> int:
+        return self.row_count - self.null_count
+
+    @property
+    def distinct_estimate(self) -> int:
+        # Never report more distinct values than non-null values
+        return min(self.distinct.estimate(), self.non_null_count)
+
+    def quantile(self, q: float) -> Optional[float]:
+        value = self.quantiles.quantile(q)
+        if value is None:
+            return None
+        return min(max(value, self.moments.min), self.moments.max)
+
+    def describe(self) -> Dict[str, Optional[float]]:
+        """Numeric summary in the layout of DataFrame.describe()"""
+        return {
+            "count": float(self.moments.count),
+            "mean": self.moments.mean if self.moments.count else None,
+            "std": self.moments.std(),
+            "min": self.moments.min,
+            "25%": self.quantile(0.25),
+            "50%": self.quantile(0.5),
+            "75%": self.quantile(0.75),
+            "max": self.moments.max,
+        }
+
+    def _timestamp(self, nanoseconds: float) -> pd.Timestamp:
+        timestamp = pd.Timestamp(int(nanoseconds))
+        return timestamp.tz_localize("UTC").tz_convert(self.tz) if self.tz is not None else timestamp
+
+    def _duration(self, nanoseconds: Optional[float]) -> Optional[str]:
+        return str(pd.Timedelta(int(round(nanoseconds)))) if nanoseconds is not None else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        profile = {
+            "name": str(self.name),
+            "dtype": self.dtype,
+            "kind": self.kind,
+            "inferred_type": self.inferred_type or "empty",
+            "count": self.non_null_count,
+            "null_count": self.null_count,
+            "distinct_estimate": self.distinct_estimate,
+        }
+        if self.kind == "numeric":
+            profile.update({
+                "min": self.moments.min,
+                "max": self.moments.max,
+                "mean": self.moments.mean if self.moments.count else None,
+                "std": self.moments.std(),
+                "skewness": self.moments.skewness(),
+                "kurtosis": self.moments.kurtosis(),
+                "quantiles": {f"{int(q * 100)}%": self.quantile(q) for q in [0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99]},
+            })
+        elif self.kind == "datetime":
+            profile.update({
+                "min": str(self._timestamp(self.moments.min)) if self.moments.count else None,
+                "max": str(self._timestamp(self.moments.max)) if self.moments.count else None,
+            })
+        elif self.kind == "timedelta":
+            profile.update({
+                "min": self._duration(self.moments.min),
+                "max": self._duration(self.moments.max),
+                "mean": self._duration(self.moments.mean if self.moments.count else None),
+                "std": self._duration(self.moments.std()),
+                "quantiles": {f"{int(q * 100)}%": self._duration(self.quantile(q)) for q in [0.05, 0.25, 0.5, 0.75, 0.95]},
+            })
+        else:
+            profile["top_values"] = self.heavy_hitters.top(self.top_k)
+            profile["top_values_max_error"] = self.heavy_hitters.max_error
+        return profile
+
+
+class ColumnProfiler:
+    """Utility class that profiles every column of a dataframe in one chunked pass"""
+
+    def __init__(self, chunk_size: int = 100000, top_k: int = 10):
+        self.chunk_size = chunk_size
+        self.top_k = top_k
+
+    def _column_kind(self, series: pd.Series) -> str:
+        if pd.api.types.is_bool_dtype(series):
+            return "boolean"
+        if pd.api.types.is_numeric_dtype(series):
+            return "numeric"
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return "datetime"
+        if pd.api.types.is_timedelta64_dtype(series):
+            return "timedelta"
+        return "categorical"
+
+    def profile_chunk(self, df: pd.DataFrame) -> Dict[str, ColumnProfile]:
+        """Profile a single chunk; chunk profiles combine with merge_profiles"""
+        profiles = {}
+        for col in df.columns:
+            series = df[col]
+            profile = ColumnProfile(col, str(series.dtype), self._column_kind(series), self.top_k)
+            profile.update(series)
+            profiles[col] = profile
+        return profiles
+
+    def merge_profiles(self, left: Dict[str, ColumnProfile], right: Dict[str, ColumnProfile]) -> Dict[str, ColumnProfile]:
+        for col, profile in right.items():
+            if col in left:
+                left[col].merge(profile)
+            else:
+                left[col] = profile
+        return left
+
+    def profile(self, df: pd.DataFrame) -> Dict[str, ColumnProfile]:
+        """Profile every column, reading the data once in row chunks"""
+        profiles = self.profile_chunk(df.iloc[:self.chunk_size])
+        for start in range(self.chunk_size, len(df), self.chunk_size):
+            self.merge_profiles(profiles, self.profile_chunk(df.iloc[start:start + self.chunk_size]))
+        return profiles
+
+    def summary(self, profiles: Dict[str, ColumnProfile]) -> Dict[str, Any]:
+        """JSON-ready profile of all columns"""
+        return {"columns": [profile.to_dict() for profile in profiles.values()]}
@@ -0,0 +1,193 @@
+from typing import Dict, List, Any, Optional, Tuple
+from collections import OrderedDict
+import threading
+import hashlib
+import pandas as pd
+import numpy as np
+import networkx as nx
+
+
+class CorrelationNetwork:
+    """Utility class that turns a correlation matrix into a laid-out network of correlated variables"""
+
+    def __init__(self, seed: int = 42, max_edges: int = 5000, large_graph_nodes: int = 300,
+                 max_cached_layouts: int = 32):
+        self.seed = seed
+        self.max_edges = max_edges
+        self.large_graph_nodes = large_graph_nodes
+        self.max_cached_layouts = max_cached_layouts
+        self._layouts = OrderedDict()
+        self._edges = OrderedDict()
+        self._lock = threading.Lock()
+
+    def correlation_matrix(self, df: pd.DataFrame, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Pearson correlations of the numeric columns, via one matrix product when nothing is missing"""
+        if columns is None:
+            columns = df.select_dtypes(include=[np.number]).columns.tolist()
+        values = df[columns]
+        if values.isna().to_numpy().any():
+            # Pairwise-complete correlations
+            return values.corr()
+
+        matrix = values.to_numpy(dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = np.corrcoef(matrix, rowvar=False)
+        return pd.DataFrame(np.atleast_2d(corr), index=columns, columns=columns)
+
+    def edge_list(self, corr: pd.DataFrame, threshold: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray, bool]:
+        """Node index pairs with |r| > threshold, keeping only the strongest max_edges"""
+        values = corr.to_numpy()
+        upper = np.triu(np.abs(np.nan_to_num(values)) > threshold, k=1)
+        source, target = np.nonzero(upper)
+        weights = values[source, target]
+
+        truncated = len(weights) > self.max_edges
+        if truncated:
+            strongest = np.argpartition(-np.abs(weights), self.max_edges - 1)[:self.max_edges]
+            strongest.sort()
+            source, target, weights = source[strongest], target[strongest], weights[strongest]
+        return source, target, weights, truncated
+
+    def _graph(self, n_nodes: int, source: np.ndarray, target: np.ndarray, weights: np.ndarray) -> nx.Graph:
+        graph = nx.Graph()
+        graph.add_nodes_from(range(n_nodes))
+        graph.add_weighted_edges_from(zip(source.tolist(), target.tolist(), np.abs(weights).tolist()))
+        return graph
+
+    def communities(self, graph: nx.Graph) -> np.ndarray:
+        """Louvain community of every node, numbered from the largest community down"""
+        labels = np.zeros(graph.number_of_nodes(), dtype=int)
+        groups = nx.community.louvain_communities(graph, weight="weight", seed=self.seed)
+        groups = sorted(groups, key=lambda members: (-len(members), min(members)))
+        for label, members in enumerate(groups):
+            labels[list(members)] = label
+        return labels
+
+    def _spring(self, graph: nx.Graph, iterations: int = 50) -> np.ndarray:
+        """Seeded force-directed layout of a graph whose nodes are numbered 0..n-1, scaled to [-1, 1]"""
+        n = graph.number_of_nodes()
+        if n == 1:
+            return np.zeros((1, 2))
+        pos = nx.spring_layout(graph, weight="weight", seed=self.seed, iterations=iterations)
+        return np.array([pos[node] for node in range(n)])
+
+    def _ring(self, n: int, radius: float) -> np.ndarray:
+        angles = 2 * np.pi * np.arange(n) / max(n, 1)
+        return radius * np.column_stack([np.cos(angles), np.sin(angles)])
+
+    def layout(self, graph: nx.Graph, labels: np.ndarray) -> Tuple[np.ndarray, str]:
+        """Node positions; large graphs are laid out one community at a time around a coarse community layout"""
+        n = graph.number_of_nodes()
+        positions = np.zeros((n, 2))
+        degree = np.array([d for _, d in sorted(graph.degree())])
+        connected = np.flatnonzero(degree > 0)
+        isolated = np.flatnonzero(degree == 0)
+
+        # Uncorrelated variables sit on an outer ring instead of drifting through the layout
+        positions[isolated] = self._ring(len(isolated), 1.15)
+        if len(connected) == 0:
+            return positions, "ring"
+
+        if len(connected) <= self.large_graph_nodes:
+            subgraph = nx.convert_node_labels_to_integers(graph.subgraph(connected.tolist()), ordering="sorted")
+            positions[connected] = self._spring(subgraph)
+            return positions, "spring"
+
+        # Coarse layout of the community graph, with edge weights summed between communities
+        community_ids = np.unique(labels[connected])
+        index = {label: i for i, label in enumerate(community_ids)}
+        coarse = nx.Graph()
+        coarse.add_nodes_from(range(len(community_ids)))
+        for u, v, weight in graph.edges(data="weight"):
+            a, b = index[labels[u]], index[labels[v]]
+            if a != b:
+                previous = coarse.get_edge_data(a, b, {"weight": 0.0})["weight"]
+                coarse.add_edge(a, b, weight=previous + weight)
+        centers = self._spring(coarse)
+
+        # Each community gets an area proportional to its size
+        sizes = np.array([(labels[connected] == label).sum() for label in community_ids])
+        radii = 0.5 * np.sqrt(sizes / sizes.sum())
+        for i, label in enumerate(community_ids):
+            members = connected[labels[connected] == label]
+            subgraph = nx.convert_node_labels_to_integers(graph.subgraph(members.tolist()), ordering="sorted")
+            local = self._spring(subgraph, iterations=30)
+            positions[members] = centers[i] * (1 - radii[i]) + local * radii[i]
+        return positions, "community"
+
+    def matrix_key(self, corr: pd.DataFrame) -> str:
+        """Fingerprint of a correlation matrix, for callers that have no dataset id"""
+        digest = hashlib.sha256(corr.to_numpy().tobytes())
+        digest.update("\x1f".join(map(str, corr.columns)).encode())
+        return digest.hexdigest()[:16]
+
+    def _cached(self, cache: OrderedDict, key: Tuple, compute):
+        with self._lock:
+            if key in cache:
+                cache.move_to_end(key)
+                return cache[key], True
+        result = compute()
+        with self._lock:
+            cache[key] = result
+            while len(cache) > self.max_cached_layouts:
+                cache.popitem(last=False)
+        return result, False
+
+    def _cached_layout(self, key: Tuple, compute):
+        return self._cached(self._layouts, key, compute)
+
+    def _network_edges(self, df: pd.DataFrame, threshold: float, columns: Optional[List[str]]) -> Tuple:
+        corr = self.correlation_matrix(df, columns)
+        nodes = corr.columns.tolist()
+        if len(nodes) < 2:
+            raise ValueError("Need at least 2 numeric columns for a correlation network")
+        return (nodes, *self.edge_list(corr, threshold)), corr
+
+    def analyze(self, df: pd.DataFrame, threshold: float = 0.5, dataset_id: Optional[str] = None,
+                columns: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Build the thresholded network, its communities and a deterministic layout cached per (dataset, threshold)"""
+        if not 0 <= threshold < 1:
+            raise ValueError("Threshold must be between 0 and 1")
+        if dataset_id is not None:
+            # The correlation matrix costs O(rows * columns^2), so its edges are kept per (dataset, threshold)
+            key = (dataset_id, round(float(threshold), 6), tuple(columns or ()))
+            edges, _ = self._cached(self._edges, key, lambda: self._network_edges(df, threshold, columns)[0])
+        else:
+            edges, corr = self._network_edges(df, threshold, columns)
+            key = (self.matrix_key(corr), round(float(threshold), 6), tuple(columns or ()))
+        nodes, source, target, weights, truncated = edges
+
+        def compute():
+            graph = self._graph(len(nodes), source, target, weights)
+            labels = self.communities(graph)
+            positions, method = self.layout(graph, labels)
+            return labels, positions, method
+
+        (labels, positions, method), cached = self._cached_layout(key, compute)
+
+        degree = np.bincount(np.concatenate([source, target]), minlength=len(nodes))
+        community_list = []
+        for label in range(labels.max() + 1):
+            members = np.flatnonzero(labels == label)
+            if len(members) > 1:
+                community_list.append({"community": label, "size": int(len(members)),
+                                       "columns": [nodes[i] for i in members]})
+
+        return {
+            "threshold": threshold,
+            "layout": method,
+            "layout_cached": cached,
+            "n_nodes": len(nodes),
+            "n_edges": int(len(weights)),
+            "edges_truncated": truncated,
+            "nodes": [
+                {"name": name, "x": round(float(x), 5), "y": round(float(y), 5),
+                 "community": int(label), "degree": int(d)}
+                for name, (x, y), label, d in zip(nodes, positions, labels, degree)
+            ],
+            "edges": [
+                {"source": nodes[s], "target": nodes[t], "correlation": round(float(w), 5)}
+                for s, t, w in zip(source, target, weights)
+            ],
+            "communities": community_list,
+        }
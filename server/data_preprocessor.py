@@ -3,6 +3,7 @@ import pandas as pd
 import numpy as np
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.impute import SimpleImputer
+from column_profiler import ColumnProfiler
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -99,14 +100,17 @@ class DataPreprocessor:
         
         return outliers
     
-    def get_feature_info(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def get_feature_info(self, df: pd.DataFrame, profiles: Dict[str, Any] = None) -> Dict[str, Any]:
         """Get comprehensive information about features"""
+        if profiles is None:
+            profiles = ColumnProfiler().profile(df)
+        
         info = {
             "total_features": len(df.columns),
             "numeric_features": len(df.select_dtypes(include=[np.number]).columns),
             "categorical_features": len(df.select_dtypes(include=['object']).columns),
-            "missing_values_per_column": df.isnull().sum().to_dict(),
-            "unique_values_per_column": df.nunique().to_dict(),
+            "missing_values_per_column": {col: profile.null_count for col, profile in profiles.items()},
+            "unique_values_per_column": {col: profile.distinct_estimate for col, profile in profiles.items()},
             "data_types": df.dtypes.astype(str).to_dict()
         }
         return info
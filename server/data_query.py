@@ -0,0 +1,200 @@
+from typing import List, Optional, Iterator, Tuple
+import pandas as pd
+import numpy as np
+import io
+import json
+
+
+class DataQuery:
+    """Utility class for paging, projecting, filtering and sorting tabular data"""
+
+    # Operators accepted in `column:op:value` filter predicates
+    FILTER_OPERATORS = ["eq", "ne", "gt", "ge", "lt", "le", "in", "contains", "isnull", "notnull"]
+    STREAM_FORMATS = ["ndjson", "arrow"]
+
+    def __init__(self, batch_size: int = 50000):
+        self.batch_size = batch_size
+        # Row order of the last filtered/sorted view, reused while the client scrolls
+        self._order_cache = None
+
+    def parse_filters(self, filters: Optional[List[str]]) -> List[Tuple[str, str, Optional[str]]]:
+        """Parse `column:op:value` filter strings into predicate tuples"""
+        predicates = []
+        for raw in filters or []:
+            parts = raw.split(":", 2)
+            if len(parts) < 2:
+                raise ValueError(f"Invalid filter '{raw}', expected 'column:op:value'")
+            column, op = parts[0], parts[1].lower()
+            value = parts[2] if len(parts) == 3 else None
+            if op not in self.FILTER_OPERATORS:
+                raise ValueError(f"Unsupported filter operator '{op}'. Use one of: {', '.join(self.FILTER_OPERATORS)}")
+            if value is None and op not in ["isnull", "notnull"]:
+                raise ValueError(f"Filter '{raw}' requires a value")
+            predicates.append((column, op, value))
+        return predicates
+
+    def parse_sort(self, sort: Optional[List[str]]) -> List[Tuple[str, bool]]:
+        """Parse sort keys, a leading '-' meaning descending"""
+        keys = []
+        for raw in sort or []:
+            if raw.startswith("-"):
+                keys.append((raw[1:], False))
+            else:
+                keys.append((raw, True))
+        return keys
+
+    def _coerce_value(self, series: pd.Series, value: str):
+        """Convert a filter value string to the dtype of the column it is compared with"""
+        if pd.api.types.is_bool_dtype(series):
+            return value.lower() in ["true", "1", "yes"]
+        if pd.api.types.is_numeric_dtype(series):
+            return pd.to_numeric(value)
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return pd.Timestamp(value)
+        return value
+
+    def _build_mask(self, df: pd.DataFrame, predicates: List[Tuple[str, str, Optional[str]]]) -> Optional[np.ndarray]:
+        """Combine filter predicates into a single boolean row mask"""
+        mask = None
+        for column, op, value in predicates:
+            series = df[column]
+            if op == "isnull":
+                cond = series.isna()
+            elif op == "notnull":
+                cond = series.notna()
+            elif op == "contains":
+                cond = series.astype(str).str.contains(value, case=False, regex=False)
+            elif op == "in":
+                cond = series.isin([self._coerce_value(series, v) for v in value.split("|")])
+            else:
+                target = self._coerce_value(series, value)
+                if op == "eq":
+                    cond = series == target
+                elif op == "ne":
+                    cond = series != target
+                elif op == "gt":
+                    cond = series > target
+                elif op == "ge":
+                    cond = series >= target
+                elif op == "lt":
+                    cond = series < target
+                else:
+                    cond = series <= target
+            cond = cond.to_numpy(dtype=bool, na_value=False)
+            mask = cond if mask is None else mask & cond
+        return mask
+
+    def _row_order(self, df: pd.DataFrame, predicates, sort_keys) -> Optional[np.ndarray]:
+        """Positional row order after filtering and sorting, or None for the natural order"""
+        if not predicates and not sort_keys:
+            return None
+
+        cache_key = (tuple(predicates), tuple(sort_keys))
+        if self._order_cache is not None:
+            cached_df, cached_key, cached_order = self._order_cache
+            if cached_df is df and cached_key == cache_key:
+                return cached_order
+
+        positions = np.arange(len(df))
+        mask = self._build_mask(df, predicates)
+        if mask is not None:
+            positions = positions[mask]
+
+        if sort_keys:
+            columns = [column for column, _ in sort_keys]
+            ascending = [asc for _, asc in sort_keys]
+            subset = df[columns].iloc[positions]
+            subset = subset.reset_index(drop=True)
+            sorted_idx = subset.sort_values(columns, ascending=ascending, kind="mergesort", na_position="last").index.to_numpy()
+            positions = positions[sorted_idx]
+
+        self._order_cache = (df, cache_key, positions)
+        return positions
+
+    def query(self, df: pd.DataFrame, columns: Optional[List[str]] = None, filters: Optional[List[str]] = None,
+              sort: Optional[List[str]] = None, offset: int = 0, limit: Optional[int] = None) -> Tuple[pd.DataFrame, int]:
+        """Return the requested page of rows and the number of rows matching the filters"""
+        if offset < 0:
+            raise ValueError("offset must be non-negative")
+
+        columns = columns or list(df.columns)
+        predicates = self.parse_filters(filters)
+        sort_keys = self.parse_sort(sort)
+
+        referenced = columns + [c for c, _, _ in predicates] + [c for c, _ in sort_keys]
+        missing = [c for c in referenced if c not in df.columns]
+        if missing:
+            raise ValueError(f"Columns not found: {', '.join(dict.fromkeys(missing))}")
+
+        order = self._row_order(df, predicates, sort_keys)
+        total = len(df) if order is None else len(order)
+        end = total if limit is None else min(offset + limit, total)
+
+        if order is None:
+            page = df.iloc[offset:end][columns]
+        else:
+            page = df.iloc[order[offset:end]][columns]
+
+        return page, total
+
+    def to_json_records(self, df: pd.DataFrame) -> str:
+        """Serialize rows to a JSON array, mapping NaN/NaT to null and NumPy scalars to native values"""
+        if df.empty:
+            return "[]"
+        # pandas rounds floats to 10 significant digits by default; 15 is the most it keeps
+        return df.to_json(orient="records", date_format="iso", default_handler=str, double_precision=15)
+
+    def iter_ndjson(self, df: pd.DataFrame) -> Iterator[bytes]:
+        """Yield newline-delimited JSON in batches"""
+        for start in range(0, len(df), self.batch_size):
+            chunk = df.iloc[start:start + self.batch_size].to_json(
+                orient="records", lines=True, date_format="iso", default_handler=str, double_precision=15
+            )
+            if not chunk.endswith("\n"):
+                chunk += "\n"
+            yield chunk.encode("utf-8")
+
+    def _to_arrow_table(self, df: pd.DataFrame):
+        """Convert rows to an Arrow table, stringifying mixed-type object columns"""
+        import pyarrow as pa
+
+        try:
+            return pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            df = df.copy()
+            for col in df.select_dtypes(include=["object"]).columns:
+                df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+            return pa.Table.from_pandas(df, preserve_index=False)
+
+    def iter_arrow_ipc(self, df: pd.DataFrame) -> Iterator[bytes]:
+        """Yield an Arrow IPC stream, one record batch at a time"""
+        import pyarrow as pa
+
+        table = self._to_arrow_table(df)
+        sink = io.BytesIO()
+
+        def drain() -> bytes:
+            data = sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+            return data
+
+        writer = pa.ipc.new_stream(sink, table.schema)
+        yield drain()
+        for batch in table.to_batches(max_chunksize=self.batch_size):
+            writer.write_batch(batch)
+            yield drain()
+        writer.close()
+        yield drain()
+
+    def page_response(self, page: pd.DataFrame, total: int, offset: int) -> str:
+        """Build the JSON body for a page of rows without materializing Python dicts"""
+        envelope = {
+            "total_rows": total,
+            "offset": offset,
+            "returned_rows": len(page),
+            "columns": [str(c) for c in page.columns],
+            "data_types": page.dtypes.astype(str).to_dict(),
+        }
+        head = json.dumps(envelope, default=str)
+        return head[:-1] + ', "data": ' + self.to_json_records(page) + "}"
@@ -0,0 +1,219 @@
+from typing import Dict, List, Any, Optional
+import json
+import os
+import re
+import tempfile
+import urllib.parse
+from logging import getLogger
+import pandas as pd
+import pyarrow as pa
+
+logger = getLogger(__name__)
+
+DATASET_STORE_DIR = os.getenv("DATASET_STORE_DIR", os.path.join(tempfile.gettempdir(), "statm8_datasets"))
+DATASET_STORE_MAX_BYTES = int(os.getenv("DATASET_STORE_MAX_BYTES", str(2 * 1024 ** 3)))
+CURRENT_POINTER = "CURRENT"
+
+
+class DatasetStore:
+    """Utility class that shares loaded datasets between worker processes as memory-mapped Arrow files"""
+
+    def __init__(self, store_dir: str = DATASET_STORE_DIR, max_bytes: int = DATASET_STORE_MAX_BYTES):
+        self.store_dir = store_dir
+        self.max_bytes = max_bytes
+        self.attached = set()
+        os.makedirs(os.path.join(store_dir, "refs"), exist_ok=True)
+        os.makedirs(os.path.join(store_dir, "workbooks"), exist_ok=True)
+
+    def _file_key(self, dataset_id: str) -> str:
+        # Dataset ids contain sheet names, which may not be valid file names
+        return urllib.parse.quote(dataset_id, safe="")
+
+    def _data_path(self, dataset_id: str) -> str:
+        return os.path.join(self.store_dir, f"{self._file_key(dataset_id)}.arrow")
+
+    def _refs_dir(self, dataset_id: str) -> str:
+        return os.path.join(self.store_dir, "refs", self._file_key(dataset_id))
+
+    def _workbook_path(self, content_hash: str) -> str:
+        if not re.fullmatch(r"[0-9a-f]{16}", content_hash):
+            raise ValueError(f"Invalid content hash: {content_hash}")
+        return os.path.join(self.store_dir, "workbooks", content_hash)
+
+    def _write_atomic(self, path: str, write):
+        partial = f"{path}.{os.getpid()}.part"
+        try:
+            write(partial)
+            os.replace(partial, path)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+
+    def contains(self, dataset_id: str) -> bool:
+        return os.path.exists(self._data_path(dataset_id))
+
+    def _to_table(self, df: pd.DataFrame) -> pa.Table:
+        """Arrow table of a dataset, with text column names and mixed-type object columns stored as text"""
+        if not all(isinstance(col, str) for col in df.columns):
+            df = df.rename(columns=str)
+        try:
+            return pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            df = df.copy(deep=False)
+            for col in df.select_dtypes(include=["object"]).columns:
+                df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+            return pa.Table.from_pandas(df, preserve_index=False)
+
+    def put(self, dataset_id: str, df: pd.DataFrame) -> bool:
+        """Write a dataset once as an uncompressed Arrow IPC file; False if it cannot be stored"""
+        if self.contains(dataset_id):
+            return True
+        try:
+            table = self._to_table(df)
+        except (pa.ArrowException, TypeError, ValueError) as e:
+            # e.g. column names that collide once converted to text; the dataset stays local to this worker
+            logger.warning(f"Dataset {dataset_id} cannot be shared between workers: {e}")
+            return False
+
+        def write(path):
+            with pa.OSFile(path, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+
+        self._write_atomic(self._data_path(dataset_id), write)
+        self.evict(keep=dataset_id)
+        return True
+
+    def attach(self, dataset_id: str) -> Optional[pd.DataFrame]:
+        """Map a stored dataset into this process; numeric columns without nulls are not copied"""
+        path = self._data_path(dataset_id)
+        try:
+            source = pa.memory_map(path, "r")
+        except FileNotFoundError:
+            return None
+        table = pa.ipc.open_file(source).read_all()
+        df = table.to_pandas(split_blocks=True)
+
+        self._add_ref(dataset_id)
+        os.utime(path)
+        return df
+
+    def _add_ref(self, dataset_id: str):
+        refs_dir = self._refs_dir(dataset_id)
+        os.makedirs(refs_dir, exist_ok=True)
+        open(os.path.join(refs_dir, str(os.getpid())), "w").close()
+        self.attached.add(dataset_id)
+
+    def release(self, dataset_id: str):
+        """Drop this process's reference to a dataset"""
+        self.attached.discard(dataset_id)
+        try:
+            os.remove(os.path.join(self._refs_dir(dataset_id), str(os.getpid())))
+        except FileNotFoundError:
+            pass
+
+    def ref_count(self, dataset_id: str) -> int:
+        """Number of live worker processes attached to a dataset, pruning references of dead ones"""
+        refs_dir = self._refs_dir(dataset_id)
+        if not os.path.isdir(refs_dir):
+            return 0
+        count = 0
+        for name in os.listdir(refs_dir):
+            try:
+                os.kill(int(name), 0)
+                count += 1
+            except ProcessLookupError:
+                os.remove(os.path.join(refs_dir, name))
+            except (ValueError, PermissionError):
+                count += 1
+        return count
+
+    def put_workbook(self, content_hash: str, content: bytes):
+        """Keep the bytes of an uploaded workbook, so any worker can open its other sheets"""
+        path = self._workbook_path(content_hash)
+        if os.path.exists(path):
+            return
+
+        def write(partial):
+            with open(partial, "wb") as f:
+                f.write(content)
+
+        self._write_atomic(path, write)
+
+    def workbook(self, content_hash: str) -> Optional[bytes]:
+        """Bytes of a stored workbook, or None if it was never stored or has been evicted"""
+        try:
+            with open(self._workbook_path(content_hash), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def set_current(self, dataset_id: str, metadata: Optional[Dict[str, Any]] = None):
+        """Publish the dataset that every worker should serve"""
+        def write(path):
+            with open(path, "w") as f:
+                json.dump({"dataset_id": dataset_id, **(metadata or {})}, f)
+
+        self._write_atomic(os.path.join(self.store_dir, CURRENT_POINTER), write)
+
+    def current(self) -> Optional[Dict[str, Any]]:
+        """The dataset published by the last upload in any worker"""
+        try:
+            with open(os.path.join(self.store_dir, CURRENT_POINTER)) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def list_datasets(self) -> List[Dict[str, Any]]:
+        """Stored datasets with their size and reference count, most recently used first"""
+        current = (self.current() or {}).get("dataset_id")
+        datasets = []
+        for name in os.listdir(self.store_dir):
+            if not name.endswith(".arrow"):
+                continue
+            path = os.path.join(self.store_dir, name)
+            key = name[:-len(".arrow")]
+            dataset_id = urllib.parse.unquote(key)
+            stat = os.stat(path)
+            datasets.append({
+                "dataset_id": dataset_id,
+                "size_bytes": stat.st_size,
+                "last_used": stat.st_mtime,
+                "ref_count": self.ref_count(dataset_id),
+                "current": dataset_id == current,
+            })
+        return sorted(datasets, key=lambda d: d["last_used"], reverse=True)
+
+    def evict(self, keep: Optional[str] = None) -> List[str]:
+        """Delete least recently used datasets no worker is attached to until the store fits max_bytes"""
+        datasets = self.list_datasets()
+        total = sum(d["size_bytes"] for d in datasets)
+        evicted = []
+        for dataset in reversed(datasets):
+            if total <= self.max_bytes:
+                break
+            if dataset["current"] or dataset["dataset_id"] == keep or dataset["ref_count"] > 0:
+                continue
+            # Mappings that are still open stay valid after the file is unlinked
+            try:
+                os.remove(self._data_path(dataset["dataset_id"]))
+            except FileNotFoundError:
+                continue
+            total -= dataset["size_bytes"]
+            evicted.append(dataset["dataset_id"])
+
+        # Workbooks go with the last of their sheets
+        remaining = {d["dataset_id"].split(":")[0] for d in datasets if d["dataset_id"] not in evicted}
+        workbooks_dir = os.path.join(self.store_dir, "workbooks")
+        for content_hash in os.listdir(workbooks_dir):
+            if re.fullmatch(r"[0-9a-f]{16}", content_hash) and content_hash not in remaining:
+                try:
+                    os.remove(os.path.join(workbooks_dir, content_hash))
+                except FileNotFoundError:
+                    pass
+        return evicted
+
+    def close(self):
+        """Release every dataset this process attached, e.g. on worker shutdown"""
+        for dataset_id in list(self.attached):
+            self.release(dataset_id)
@@ -0,0 +1,172 @@
+from typing import Dict, List, Any, Optional, Tuple
+import pandas as pd
+import numpy as np
+import datetime
+import io
+import re
+import zipfile
+import posixpath
+import xml.etree.ElementTree as ET
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
+SPREADSHEET_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+RELATIONSHIP_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PACKAGE_RELATIONSHIP_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# The <dimension> element sits in the sheet header, ahead of any cell data
+DIMENSION_PATTERN = re.compile(rb'<(?:\w+:)?dimension\s+ref="([A-Z]+)(\d+)(?::([A-Z]+)(\d+))?"')
+DIMENSION_SCAN_BYTES = 8192
+
+
+def _column_number(letters: str) -> int:
+    """Convert a spreadsheet column reference such as 'AB' to a 1-based number"""
+    number = 0
+    for char in letters:
+        number = number * 26 + (ord(char) - ord("A") + 1)
+    return number
+
+
+class ExcelWorkbook:
+    """Excel workbook whose sheets are listed from metadata and parsed lazily on first use"""
+
+    def __init__(self, file_content: bytes, filename: str):
+        self.file_content = file_content
+        self.filename = filename
+        self.file_extension = filename.split('.')[-1].lower()
+        self.engine = "calamine" if CalamineWorkbook is not None else ("openpyxl" if self.file_extension == "xlsx" else "xlrd")
+        self.frames = {}
+        self._calamine_workbook = None
+        self.sheets = self._read_sheet_metadata()
+
+    def _read_sheet_metadata(self) -> List[Dict[str, Any]]:
+        """List sheets and their dimensions without parsing any cell data"""
+        if self.file_extension == "xlsx":
+            return self._read_xlsx_metadata()
+
+        import xlrd
+        book = xlrd.open_workbook(file_contents=self.file_content, on_demand=True)
+        try:
+            return [
+                {"name": name, "index": i, "rows": None, "columns": None}
+                for i, name in enumerate(book.sheet_names())
+            ]
+        finally:
+            book.release_resources()
+
+    def _read_xlsx_metadata(self) -> List[Dict[str, Any]]:
+        """Read sheet names from workbook.xml and sizes from each sheet's <dimension> header"""
+        sheets = []
+        with zipfile.ZipFile(io.BytesIO(self.file_content)) as archive:
+            workbook = ET.fromstring(archive.read("xl/workbook.xml"))
+            rels = ET.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+            targets = {
+                rel.get("Id"): rel.get("Target")
+                for rel in rels.iter(f"{PACKAGE_RELATIONSHIP_NS}Relationship")
+            }
+
+            for i, sheet in enumerate(workbook.iter(f"{SPREADSHEET_NS}sheet")):
+                target = targets.get(sheet.get(f"{RELATIONSHIP_NS}id"), "")
+                path = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+                rows, columns = self._read_dimension(archive, path)
+                sheets.append({"name": sheet.get("name"), "index": i, "rows": rows, "columns": columns})
+        return sheets
+
+    def _read_dimension(self, archive: zipfile.ZipFile, path: str) -> Tuple[Optional[int], Optional[int]]:
+        """Get (rows, columns) from the first bytes of a worksheet part"""
+        try:
+            with archive.open(path) as part:
+                header = part.read(DIMENSION_SCAN_BYTES)
+        except KeyError:
+            return None, None
+
+        match = DIMENSION_PATTERN.search(header)
+        if not match:
+            return None, None
+        first_col, first_row, last_col, last_row = match.groups()
+        if last_col is None:
+            # A single-cell reference such as "A1" marks an empty sheet
+            return 0, 0
+        rows = int(last_row) - int(first_row) + 1
+        columns = _column_number(last_col.decode()) - _column_number(first_col.decode()) + 1
+        return rows, columns
+
+    @property
+    def sheet_names(self) -> List[str]:
+        return [sheet["name"] for sheet in self.sheets]
+
+    def list_sheets(self) -> List[Dict[str, Any]]:
+        """Get sheet metadata with the loaded state of each sheet"""
+        return [{**sheet, "loaded": sheet["name"] in self.frames} for sheet in self.sheets]
+
+    def load_sheet(self, sheet_name: Optional[str] = None) -> pd.DataFrame:
+        """Parse a sheet into a dataframe once and reuse it afterwards"""
+        if sheet_name is None:
+            sheet_name = self.sheet_names[0]
+        if sheet_name not in self.sheet_names:
+            raise ValueError(f"Sheet '{sheet_name}' not found. Available sheets: {', '.join(self.sheet_names)}")
+
+        if sheet_name not in self.frames:
+            if self.engine == "calamine":
+                self.frames[sheet_name] = self._read_with_calamine(sheet_name)
+            else:
+                self.frames[sheet_name] = pd.read_excel(io.BytesIO(self.file_content), sheet_name=sheet_name, engine=self.engine)
+        return self.frames[sheet_name]
+
+    def _header_name(self, name: Any, position: int) -> str:
+        """Column name of a header cell, formatted the way pd.read_excel labels columns"""
+        if name is None or name == "":
+            return f"Unnamed: {position}"
+        if isinstance(name, float) and name.is_integer():
+            # calamine reports every number as a float; a header of 2020 should not become "2020.0"
+            return str(int(name))
+        return str(name)
+
+    def _dedupe_header(self, names: List[str]) -> List[str]:
+        """Rename repeated column names to name.1, name.2, ... as pandas does"""
+        seen = {}
+        used = set(names)
+        result = []
+        for name in names:
+            if name not in seen:
+                seen[name] = 0
+                result.append(name)
+                continue
+            count = seen[name]
+            candidate = f"{name}.{count + 1}"
+            while candidate in used:
+                count += 1
+                candidate = f"{name}.{count + 1}"
+            seen[name] = count + 1
+            used.add(candidate)
+            result.append(candidate)
+        return result
+
+    def _read_with_calamine(self, sheet_name: str) -> pd.DataFrame:
+        """Read a sheet with the Rust calamine reader, matching the dtypes of pd.read_excel"""
+        if self._calamine_workbook is None:
+            self._calamine_workbook = CalamineWorkbook.from_filelike(io.BytesIO(self.file_content))
+
+        rows = self._calamine_workbook.get_sheet_by_name(sheet_name).to_python(skip_empty_area=True)
+        if not rows:
+            return pd.DataFrame()
+
+        header = self._dedupe_header([self._header_name(name, i) for i, name in enumerate(rows[0])])
+        # calamine reports empty cells as empty strings
+        data = [[None if value == "" else value for value in row] for row in rows[1:]]
+        df = pd.DataFrame(data, columns=header)
+
+        for col in df.columns:
+            values = df[col]
+            if values.dtype == object:
+                present = values.dropna()
+                # Date cells arrive as date/datetime objects; pandas reads them as datetime64
+                if len(present) and present.map(lambda v: isinstance(v, (datetime.date, datetime.datetime))).all():
+                    df[col] = pd.to_datetime(values)
+            elif pd.api.types.is_float_dtype(values) and values.notna().all() and (values % 1 == 0).all():
+                # ...and every number as a float
+                df[col] = values.astype("int64")
+        return df
@@ -0,0 +1,152 @@
+from typing import Dict, List, Any, Optional, Iterator, BinaryIO
+import pandas as pd
+import numpy as np
+import io
+import json
+
+NDJSON_EXTENSIONS = ["ndjson", "jsonl"]
+FORMAT_SNIFF_BYTES = 65536
+
+
+class JsonLoader:
+    """Utility class for loading JSON documents and newline-delimited JSON into flat dataframes"""
+
+    def __init__(self, max_depth: int = 3, batch_size: int = 50000, schema_sample_size: int = 1000):
+        self.max_depth = max_depth
+        self.batch_size = batch_size
+        self.schema_sample_size = schema_sample_size
+        self.schema = None
+        self.detected_format = None
+
+    def detect_format(self, stream: BinaryIO, file_extension: str = "json") -> str:
+        """Tell newline-delimited JSON from a single JSON document by peeking at the first lines"""
+        if file_extension in NDJSON_EXTENSIONS:
+            return "ndjson"
+
+        start = stream.tell()
+        head = stream.read(FORMAT_SNIFF_BYTES)
+        stream.seek(start)
+
+        lines = [line.strip() for line in head.lstrip(b"\xef\xbb\xbf").splitlines() if line.strip()]
+        if not lines or not lines[0].startswith(b"{") or len(lines) < 2:
+            return "document"
+        try:
+            json.loads(lines[0])
+        except json.JSONDecodeError:
+            # First line is only part of a pretty-printed object
+            return "document"
+        return "ndjson"
+
+    def iter_ndjson_batches(self, stream: BinaryIO) -> Iterator[List[Dict[str, Any]]]:
+        """Read newline-delimited JSON line by line, yielding lists of records"""
+        batch = []
+        for line_number, line in enumerate(stream, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON on line {line_number}: {e.msg}")
+            batch.append(record if isinstance(record, dict) else {"value": record})
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _document_records(self, document: Any) -> Optional[List[Any]]:
+        """Find the list of records in a parsed JSON document, if it has one"""
+        if isinstance(document, list):
+            return document
+        if isinstance(document, dict):
+            record_lists = [v for v in document.values() if isinstance(v, list) and v and isinstance(v[0], dict)]
+            if len(record_lists) == 1:
+                return record_lists[0]
+        return None
+
+    def flatten(self, records: List[Dict[str, Any]]) -> pd.DataFrame:
+        """Flatten nested records into dotted columns, encoding deeper values and lists as JSON text"""
+        frame = pd.json_normalize(records, sep=".", max_level=self.max_depth)
+        for col in frame.select_dtypes(include=["object"]).columns:
+            values = frame[col]
+            nested = values.map(lambda v: isinstance(v, (dict, list)))
+            if nested.any():
+                frame[col] = values.where(~nested, values[nested].map(lambda v: json.dumps(v, default=str)))
+        return frame
+
+    def infer_schema(self, frame: pd.DataFrame) -> Dict[str, str]:
+        """Infer a column kind for every column from a sample of flattened records"""
+        sample = frame.head(self.schema_sample_size)
+        return {col: self._column_kind(sample[col]) for col in sample.columns}
+
+    def _column_kind(self, values: pd.Series) -> str:
+        inferred = pd.api.types.infer_dtype(values, skipna=True)
+        if inferred in ["integer", "floating", "mixed-integer-float", "decimal"]:
+            return "numeric"
+        if inferred == "boolean":
+            return "boolean"
+        if inferred == "empty":
+            return "unknown"
+        return "string"
+
+    def _as_string(self, values: pd.Series) -> pd.Series:
+        """Text form of a column, keeping missing values missing and whole floats without a trailing .0"""
+        if pd.api.types.is_float_dtype(values) and (values.dropna() % 1 == 0).all():
+            values = values.astype("Int64")
+        return values.astype(str).where(values.notna(), np.nan)
+
+    def apply_schema(self, frame: pd.DataFrame, schema: Dict[str, str]) -> pd.DataFrame:
+        """Conform a batch to the schema; a numeric column holding values that are not numbers is widened to string"""
+        for col in frame.columns:
+            if col not in schema or schema[col] == "unknown":
+                schema[col] = self._column_kind(frame[col])
+        frame = frame.reindex(columns=list(schema))
+
+        for col, kind in schema.items():
+            values = frame[col]
+            if kind == "numeric":
+                numeric = pd.to_numeric(values, errors="coerce")
+                if (numeric.isna() & values.notna()).any():
+                    # The sample the schema came from was numeric but this batch is not; keep the text
+                    schema[col] = "string"
+                    frame[col] = self._as_string(values)
+                else:
+                    frame[col] = numeric
+            elif kind == "string" and values.dtype == object:
+                frame[col] = values.where(values.isna(), values.astype(str))
+        return frame
+
+    def load(self, stream: BinaryIO, file_extension: str = "json") -> pd.DataFrame:
+        """Load JSON or NDJSON from a binary stream into a flat dataframe"""
+        self.detected_format = self.detect_format(stream, file_extension)
+
+        if self.detected_format == "ndjson":
+            batches = self.iter_ndjson_batches(stream)
+        else:
+            content = stream.read()
+            records = self._document_records(json.loads(content))
+            if records is None:
+                # Column-oriented and other pandas layouts
+                self.schema = None
+                return pd.read_json(io.BytesIO(content))
+            records = [r if isinstance(r, dict) else {"value": r} for r in records]
+            batches = (records[i:i + self.batch_size] for i in range(0, len(records), self.batch_size))
+
+        self.schema = None
+        frames = []
+        for batch in batches:
+            frame = self.flatten(batch)
+            if self.schema is None:
+                self.schema = self.infer_schema(frame)
+            frames.append(self.apply_schema(frame, self.schema))
+
+        if not frames:
+            return pd.DataFrame()
+        # Columns widened to string by a later batch are converted in the batches read before it
+        for frame in frames:
+            for col, kind in self.schema.items():
+                if kind == "string" and col in frame and frame[col].dtype != object:
+                    frame[col] = self._as_string(frame[col])
+        df = pd.concat(frames, ignore_index=True)
+        return df.reindex(columns=list(self.schema))
@@ -0,0 +1,592 @@
+from typing import Dict, List, Any, Optional, Callable, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import base64
+import html
+import io
+import json
+import os
+import re
+import tempfile
+import textwrap
+import threading
+import time
+import uuid
+import zipfile
+from logging import getLogger
+
+logger = getLogger(__name__)
+
+EXPORT_DIR = os.getenv("EXPORT_DIR", os.path.join(tempfile.gettempdir(), "statm8_exports"))
+# markdown and latex exports are zip archives with the report source and its chart files
+EXPORT_FORMATS = ["pdf", "markdown", "latex", "zip", "html"]
+EXPORT_EXTENSIONS = {"pdf": "pdf", "html": "html", "markdown": "zip", "latex": "zip", "zip": "zip"}
+EXPORT_MEDIA_TYPES = {"pdf": "application/pdf", "html": "text/html", "zip": "application/zip"}
+EXPORT_MAX_JOBS = int(os.getenv("EXPORT_MAX_JOBS", "200"))
+EXPORT_TTL_SECONDS = int(os.getenv("EXPORT_TTL_SECONDS", str(7 * 24 * 3600)))
+PLOTLY_JS_URL = "https://cdn.plot.ly/plotly-2.27.0.min.js"
+LATEX_ESCAPES = {
+    "\\": r"\textbackslash{}", "&": r"\&", "%": r"\%", "$": r"\$", "#": r"\#", "_": r"\_",
+    "{": r"\{", "}": r"\}", "~": r"\textasciitilde{}", "^": r"\textasciicircum{}",
+}
+
+
+def _jsonable(value):
+    """Recursively convert analysis results into JSON-serializable values"""
+    if isinstance(value, dict):
+        return {str(_jsonable(k)): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if hasattr(value, "item") and not isinstance(value, (str, bytes)):
+        return value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+class ReportExporter:
+    """Utility class that renders a full analysis report for the loaded dataset"""
+
+    def __init__(self, export_dir: str = EXPORT_DIR):
+        self.export_dir = export_dir
+
+    def _sections(self, options: Dict[str, Any]) -> List[str]:
+        sections = []
+        if options.get("include_summary", True):
+            sections += ["summary", "correlation"]
+        if options.get("include_plots", True):
+            sections.append("visualizations")
+        if options.get("include_ml", True):
+            if options.get("target_column"):
+                sections.append("machine_learning")
+            sections.append("clustering")
+        return sections
+
+    def _run_section(self, analyzer, section: str, options: Dict[str, Any]) -> Dict[str, Any]:
+        """Compute one report section, reusing results the API has already cached"""
+        if section == "summary":
+            return analyzer.cached_result("basic", "", analyzer.basic_analysis)
+        if section == "correlation":
+            return analyzer.cached_result("correlation", "", analyzer.correlation_analysis)
+        if section == "visualizations":
+            return analyzer.cached_result("visualize", "auto", lambda: analyzer.generate_visualizations("auto"))
+        if section == "machine_learning":
+            target, task_type = options["target_column"], options.get("task_type", "auto")
+            return analyzer.cached_result("ml", f"{target}|{task_type}", lambda: analyzer.perform_ml_analysis(target, task_type))
+        if section == "clustering":
+            n_clusters = options.get("n_clusters", 3)
+            return analyzer.cached_result("clustering", str(n_clusters), lambda: analyzer.clustering_analysis(n_clusters))
+        raise ValueError(f"Unknown report section: {section}")
+
+    def render(self, analyzer, options: Dict[str, Any], path: str, progress: Callable[[str, float], None]) -> Dict[str, Any]:
+        """Compute every section and write the report to path, returning a manifest"""
+        sections = self._sections(options)
+        results, errors = {}, {}
+
+        for i, section in enumerate(sections):
+            progress(section, i / (len(sections) + 1))
+            try:
+                results[section] = _jsonable(self._run_section(analyzer, section, options))
+            except Exception as e:
+                # A failing section (e.g. too few numeric columns) should not sink the whole report
+                errors[section] = getattr(e, "detail", None) or str(e)
+
+        progress("writing", len(sections) / (len(sections) + 1))
+        title = options.get("title") or f"StatM8 Analysis Report - {options.get('csv_name') or analyzer.dataset_id}"
+        blocks = self.report_blocks(title, results, errors, options)
+
+        export_format = options.get("format", "zip")
+        if export_format == "html":
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(self.render_html(title, blocks))
+        elif export_format == "pdf":
+            self.render_pdf(path, title, blocks)
+        elif export_format == "markdown":
+            self._write_archive(path, "report.md", self.render_markdown(blocks), results, errors)
+        elif export_format == "latex":
+            self._write_archive(path, "report.tex", self.render_latex(title, blocks), results, errors)
+        else:
+            self._write_archive(path, "report.html", self.render_html(title, blocks), results, errors)
+
+        return {
+            "sections_included": [s for s in sections if s in results],
+            "section_errors": errors,
+            "total_plots": len(results.get("visualizations", {}).get("visualizations", {}))
+                           + (1 if results.get("correlation", {}).get("heatmap") else 0),
+        }
+
+    def _write_archive(self, path: str, report_name: str, report: str, results: Dict[str, Any], errors: Dict[str, str]):
+        """Write the report, raw results and chart files into a zip archive"""
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr(report_name, report)
+
+            heatmap = results.get("correlation", {}).get("heatmap")
+            if heatmap:
+                archive.writestr("charts/correlation_heatmap.png", base64.b64decode(heatmap))
+            for name, figure in results.get("visualizations", {}).get("visualizations", {}).items():
+                archive.writestr(f"charts/{name}.json", figure)
+            visualization = results.get("clustering", {}).get("visualization")
+            if visualization:
+                archive.writestr("charts/clustering.json", visualization)
+
+            # Charts are stored as separate files above, keep results.json compact
+            stripped = json.loads(json.dumps(results))
+            stripped.get("correlation", {}).pop("heatmap", None)
+            stripped.pop("visualizations", None)
+            stripped.get("clustering", {}).pop("visualization", None)
+            with archive.open("results.json", "w") as f:
+                f.write(json.dumps({"results": stripped, "errors": errors}, indent=2, default=str).encode("utf-8"))
+
+    def code_snippets(self, results: Dict[str, Any], options: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """Python that reproduces each included section with pandas and scikit-learn"""
+        filename = options.get("csv_name") or "data.csv"
+        reader = {"xlsx": "read_excel", "xls": "read_excel", "json": "read_json"}.get(filename.split(".")[-1].lower(), "read_csv")
+        snippets = [("Load the data", f"import pandas as pd\n\ndf = pd.{reader}({filename!r})")]
+        if "summary" in results:
+            snippets.append(("Dataset summary", "df.describe()\ndf.isnull().sum()"))
+        if "correlation" in results:
+            snippets.append(("Correlation analysis",
+                             "correlation = df.select_dtypes(include='number').corr()\n"
+                             "strong = correlation.where(correlation.abs() > 0.5).stack()"))
+        if "machine_learning" in results:
+            target, task_type = options["target_column"], results["machine_learning"]["task_type"]
+            model = "RandomForestClassifier" if task_type == "classification" else "RandomForestRegressor"
+            snippets.append((f"Machine learning ({task_type})",
+                             f"from sklearn.ensemble import {model}\n"
+                             "from sklearn.model_selection import train_test_split\n"
+                             "from sklearn.preprocessing import LabelEncoder\n\n"
+                             f"X, y = df.drop(columns=[{target!r}]), df[{target!r}]\n"
+                             "for col in X.select_dtypes(include='object').columns:\n"
+                             "    X[col] = LabelEncoder().fit_transform(X[col].astype(str))\n"
+                             "X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)\n"
+                             f"model = {model}(n_estimators=100, random_state=42).fit(X_train, y_train)\n"
+                             "model.score(X_test, y_test)"))
+        if "clustering" in results:
+            snippets.append(("Clustering",
+                             "from sklearn.cluster import KMeans\n"
+                             "from sklearn.preprocessing import StandardScaler\n\n"
+                             "X = df.select_dtypes(include='number')\n"
+                             "X = StandardScaler().fit_transform(X.fillna(X.mean()))\n"
+                             f"df['cluster'] = KMeans(n_clusters={results['clustering']['n_clusters']}, "
+                             "random_state=42).fit_predict(X)"))
+        return snippets
+
+    def report_blocks(self, title: str, results: Dict[str, Any], errors: Dict[str, str],
+                      options: Optional[Dict[str, Any]] = None) -> List[tuple]:
+        """Lay the report out as (kind, ...) blocks that every output format renders"""
+        options = options or {}
+        blocks = [("heading", 1, title),
+                  ("text", f"Generated {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')}")]
+
+        if "summary" in results:
+            info = results["summary"]["basic_info"]
+            blocks += [
+                ("heading", 2, "Dataset Summary"),
+                ("text", f"{info['shape'][0]} rows, {info['shape'][1]} columns, "
+                         f"{len(info['numeric_columns'])} numeric, {len(info['categorical_columns'])} categorical."),
+                ("heading", 3, "Descriptive Statistics"),
+                ("table", results["summary"]["descriptive_stats"]),
+                ("heading", 3, "Missing Values"),
+                ("table", {col: {"missing": n} for col, n in info["missing_values"].items()}),
+            ]
+
+        if "correlation" in results:
+            correlation = results["correlation"]
+            blocks.append(("heading", 2, "Correlation Analysis"))
+            if correlation.get("heatmap"):
+                blocks.append(("image", "correlation_heatmap", correlation["heatmap"]))
+            if correlation.get("strong_correlations"):
+                blocks.append(("table", {
+                    f"{c['var1']} / {c['var2']}": {"correlation": c["correlation"]}
+                    for c in correlation["strong_correlations"]
+                }))
+            elif correlation.get("message"):
+                blocks.append(("text", correlation["message"]))
+
+        if "visualizations" in results:
+            blocks.append(("heading", 2, "Visualizations"))
+            for name, figure in results["visualizations"]["visualizations"].items():
+                blocks.append(("chart", name, figure))
+
+        if "machine_learning" in results:
+            ml = results["machine_learning"]
+            blocks.append(("heading", 2, f"Machine Learning ({ml['task_type']})"))
+            for model, metrics in ml.items():
+                if isinstance(metrics, dict):
+                    scores = {k: v for k, v in metrics.items() if k != "feature_importance"}
+                    blocks += [("heading", 3, model.replace("_", " ").title()), ("table", {model: scores})]
+                    if "feature_importance" in metrics:
+                        blocks.append(("table", {f: {"importance": v} for f, v in metrics["feature_importance"].items()}))
+
+        if "clustering" in results:
+            clustering = results["clustering"]
+            blocks += [
+                ("heading", 2, "Clustering"),
+                ("text", f"{clustering['n_clusters']} clusters, inertia {round(clustering['inertia'], 4)}"),
+                ("table", {k: {"size": v} for k, v in clustering["cluster_sizes"].items()}),
+            ]
+            if clustering.get("visualization"):
+                blocks.append(("chart", "clustering", clustering["visualization"]))
+
+        if options.get("include_code"):
+            blocks.append(("heading", 2, "Analysis Code"))
+            for caption, code in self.code_snippets(results, options):
+                blocks += [("heading", 3, caption), ("code", code)]
+
+        if errors:
+            blocks += [("heading", 2, "Skipped Sections"), ("list", [f"{s}: {e}" for s, e in errors.items()])]
+        return blocks
+
+    def _cell(self, value: Any) -> str:
+        if value is None:
+            return ""
+        return str(round(value, 4) if isinstance(value, float) else value)
+
+    def _table_rows(self, rows: Dict[str, Dict[str, Any]]) -> Tuple[List[str], List[List[str]]]:
+        """Header and body cells of a {row name: {column: value}} table"""
+        columns = list(next(iter(rows.values())).keys())
+        body = [[str(name)] + [self._cell(values.get(c)) for c in columns] for name, values in rows.items()]
+        return [str(c) for c in columns], body
+
+    def _table(self, rows: Dict[str, Dict[str, Any]]) -> str:
+        if not rows:
+            return "<p>No data.</p>"
+        columns, body = self._table_rows(rows)
+        head = "".join(f"<th>{html.escape(c)}</th>" for c in columns)
+        cells = "".join(
+            f"<tr><th>{html.escape(row[0])}</th>{''.join(f'<td>{html.escape(v)}</td>' for v in row[1:])}</tr>"
+            for row in body
+        )
+        return f"<table><tr><th></th>{head}</tr>{cells}</table>"
+
+    def _plotly(self, div_id: str, figure_json: str) -> str:
+        # Column names and labels end up in the figure; keep them from closing the script tag
+        figure_json = figure_json.replace("</", "<\\/")
+        return (f'<div id="{div_id}" class="chart"></div>'
+                f'<script>(function(){{var f={figure_json};Plotly.newPlot("{div_id}",f.data,f.layout);}})();</script>')
+
+    def render_html(self, title: str, blocks: List[tuple]) -> str:
+        """Render a self-contained HTML report with embedded interactive Plotly charts"""
+        parts = []
+        for block in blocks:
+            kind = block[0]
+            if kind == "heading":
+                parts.append(f"<h{block[1]}>{html.escape(block[2])}</h{block[1]}>")
+            elif kind == "text":
+                parts.append(f"<p>{html.escape(block[1])}</p>")
+            elif kind == "table":
+                parts.append(self._table(block[1]))
+            elif kind == "image":
+                parts.append(f'<img alt="{block[1].replace("_", " ").capitalize()}" src="data:image/png;base64,{block[2]}">')
+            elif kind == "chart":
+                parts.append(self._plotly(f"chart_{block[1]}", block[2]))
+            elif kind == "list":
+                parts.append("<ul>" + "".join(f"<li>{html.escape(item)}</li>" for item in block[1]) + "</ul>")
+            elif kind == "code":
+                parts.append(f"<pre><code>{html.escape(block[1])}</code></pre>")
+
+        return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{html.escape(title)}</title>
+<script src="{PLOTLY_JS_URL}"></script>
+<style>body{{font-family:sans-serif;max-width:1100px;margin:auto;padding:1em}}table{{border-collapse:collapse;margin:1em 0}}
+td,th{{border:1px solid #ddd;padding:4px 8px;text-align:right}}pre{{background:#f6f8fa;padding:1em;overflow-x:auto}}img{{max-width:100%}}.chart{{height:450px}}</style>
+</head><body>
+{chr(10).join(parts)}
+</body></html>"""
+
+    def render_markdown(self, blocks: List[tuple]) -> str:
+        """Render the report as Markdown that refers to the chart files next to it in the archive"""
+        def escape(text: str) -> str:
+            return text.replace("|", "\\|").replace("\n", " ")
+
+        parts = []
+        for block in blocks:
+            kind = block[0]
+            if kind == "heading":
+                parts.append(f"{'#' * block[1]} {block[2]}")
+            elif kind == "text":
+                parts.append(block[1])
+            elif kind == "table":
+                if not block[1]:
+                    parts.append("No data.")
+                    continue
+                columns, body = self._table_rows(block[1])
+                lines = ["| | " + " | ".join(map(escape, columns)) + " |",
+                         "|---|" + "---:|" * len(columns)]
+                lines += ["| " + " | ".join(map(escape, row)) + " |" for row in body]
+                parts.append("\n".join(lines))
+            elif kind == "image":
+                parts.append(f"![{block[1].replace('_', ' ').capitalize()}](charts/{block[1]}.png)")
+            elif kind == "chart":
+                parts.append(f"Interactive chart: [`charts/{block[1]}.json`](charts/{block[1]}.json) (Plotly figure)")
+            elif kind == "list":
+                parts.append("\n".join(f"- {item}" for item in block[1]))
+            elif kind == "code":
+                parts.append(f"```python\n{block[1]}\n```")
+        return "\n\n".join(parts) + "\n"
+
+    def render_latex(self, title: str, blocks: List[tuple]) -> str:
+        """Render the report as a LaTeX document that includes the chart images from the archive"""
+        def escape(text: str) -> str:
+            return "".join(LATEX_ESCAPES.get(ch, ch) for ch in text)
+
+        parts = []
+        for block in blocks:
+            kind = block[0]
+            if kind == "heading":
+                if block[1] > 1:
+                    parts.append(f"\\{'sub' * (block[1] - 2)}section*{{{escape(block[2])}}}")
+            elif kind == "text":
+                parts.append(escape(block[1]) + "\n")
+            elif kind == "table":
+                if not block[1]:
+                    parts.append("No data.\n")
+                    continue
+                columns, body = self._table_rows(block[1])
+                lines = [f"\\begin{{longtable}}{{l{'r' * len(columns)}}}", "\\hline",
+                         " & " + " & ".join(map(escape, columns)) + " \\\\", "\\hline"]
+                lines += [" & ".join(map(escape, row)) + " \\\\" for row in body]
+                lines += ["\\hline", "\\end{longtable}"]
+                parts.append("\n".join(lines))
+            elif kind == "image":
+                parts.append(f"\\begin{{center}}\\includegraphics[width=\\linewidth]{{charts/{block[1]}.png}}\\end{{center}}")
+            elif kind == "chart":
+                parts.append(f"Interactive chart: \\texttt{{{escape(f'charts/{block[1]}.json')}}} (Plotly figure)\n")
+            elif kind == "list":
+                parts.append("\\begin{itemize}\n" + "\n".join(f"\\item {escape(item)}" for item in block[1])
+                             + "\n\\end{itemize}")
+            elif kind == "code":
+                parts.append(f"\\begin{{verbatim}}\n{block[1]}\n\\end{{verbatim}}")
+
+        return ("\\documentclass{article}\n\\usepackage[T1]{fontenc}\n\\usepackage[utf8]{inputenc}\n"
+                "\\usepackage[margin=2cm]{geometry}\n\\usepackage{graphicx}\n\\usepackage{longtable}\n"
+                f"\\title{{{escape(title)}}}\n\\date{{{datetime.now(timezone.utc).strftime('%Y-%m-%d')}}}\n"
+                "\\begin{document}\n\\maketitle\n\n" + "\n\n".join(parts) + "\n\n\\end{document}\n")
+
+    def render_pdf(self, path: str, title: str, blocks: List[tuple]):
+        """Render a static PDF report; interactive charts are listed, the heatmap is drawn"""
+        # Figure objects are used directly rather than pyplot, which is not safe to use from the export thread
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_pdf import PdfPages
+        import matplotlib.image as mpimg
+
+        lines = []
+        images = []
+        for block in blocks:
+            kind = block[0]
+            if kind == "heading":
+                lines += ["", (block[2], 16 - 2 * block[1], "bold")]
+            elif kind == "text":
+                lines += [(line, 9, "normal") for line in textwrap.wrap(block[1], 100)]
+            elif kind == "table":
+                if not block[1]:
+                    lines.append(("No data.", 9, "normal"))
+                    continue
+                columns, body = self._table_rows(block[1])
+                widths = [max(len(row[i]) for row in [[""] + columns] + body) for i in range(len(columns) + 1)]
+                for row in [[""] + columns] + body:
+                    text = "  ".join(cell[:30].ljust(min(width, 30)) for cell, width in zip(row, widths))
+                    lines.append((text[:110], 7, "mono"))
+                lines.append("")
+            elif kind == "image":
+                lines.append((f"[{block[1].replace('_', ' ')}: see figure page]", 9, "normal"))
+                images.append((block[1], block[2]))
+            elif kind == "chart":
+                lines.append((f"Interactive chart {block[1]} is included in the HTML and ZIP exports", 9, "normal"))
+            elif kind == "list":
+                lines += [(f"- {item}"[:110], 9, "normal") for item in block[1]]
+            elif kind == "code":
+                lines += [(line[:110], 7, "mono") for line in block[1].split("\n")] + [""]
+
+        with PdfPages(path) as pdf:
+            pdf.infodict()["Title"] = title
+            y = 0
+            fig = None
+            for line in lines:
+                text, size, style = line if line else ("", 9, "normal")
+                if fig is None or y < 0.06:
+                    if fig is not None:
+                        pdf.savefig(fig)
+                    fig = Figure(figsize=(8.27, 11.69))
+                    y = 0.95
+                # Escape $ so column names are not parsed as mathtext
+                fig.text(0.06, y, text.replace("$", r"\$"), fontsize=size, fontweight="bold" if style == "bold" else "normal",
+                         family="monospace" if style == "mono" else "sans-serif", va="top")
+                y -= (size + 4) / 72 / 11.69
+            if fig is not None:
+                pdf.savefig(fig)
+
+            for name, image in images:
+                fig = Figure(figsize=(8.27, 11.69))
+                ax = fig.add_axes([0.05, 0.05, 0.9, 0.88])
+                ax.imshow(mpimg.imread(io.BytesIO(base64.b64decode(image)), format="png"))
+                ax.set_axis_off()
+                fig.suptitle(name.replace("_", " ").capitalize())
+                pdf.savefig(fig)
+
+
+class ExportManager:
+    """Runs report exports in a background worker and tracks their progress.
+
+    Job records are JSON files next to the exports, so every worker process can report on and serve any export.
+    """
+
+    def __init__(self, exporter: Optional[ReportExporter] = None, max_workers: int = 1,
+                 max_jobs: int = EXPORT_MAX_JOBS, ttl: int = EXPORT_TTL_SECONDS):
+        self.exporter = exporter or ReportExporter()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="export")
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        os.makedirs(self.exporter.export_dir, exist_ok=True)
+
+    def _job_path(self, export_id: str) -> str:
+        if not re.fullmatch(r"[0-9a-f]{32}", export_id):
+            raise KeyError(export_id)
+        return os.path.join(self.exporter.export_dir, f"{export_id}.json")
+
+    def _read_job(self, export_id: str) -> Dict[str, Any]:
+        try:
+            with open(self._job_path(export_id)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise KeyError(export_id)
+
+    def _write_job(self, job: Dict[str, Any]):
+        path = self._job_path(job["export_id"])
+        partial = f"{path}.{uuid.uuid4().hex}.part"
+        with open(partial, "w") as f:
+            json.dump(job, f)
+        os.replace(partial, path)
+
+    def _jobs(self) -> List[Dict[str, Any]]:
+        jobs = []
+        for name in os.listdir(self.exporter.export_dir):
+            if re.fullmatch(r"[0-9a-f]{32}\.json", name):
+                try:
+                    jobs.append(self._read_job(name[:-len(".json")]))
+                except (KeyError, json.JSONDecodeError):
+                    continue
+        return jobs
+
+    def _update(self, export_id: str, **fields):
+        # Only the worker that runs a job writes its record
+        with self.lock:
+            job = self._read_job(export_id)
+            job.update(fields)
+            self._write_job(job)
+
+    def submit(self, analyzer, options: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue an export of the analyzer's dataset and return the job record"""
+        export_format = options.get("format", "zip")
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {export_format}. Use one of: {', '.join(EXPORT_FORMATS)}")
+        self.cleanup()
+
+        export_id = uuid.uuid4().hex
+        extension = EXPORT_EXTENSIONS[export_format]
+        job = {
+            "export_id": export_id,
+            "uid": options.get("uid"),
+            "csv_id": options.get("csv_id") or analyzer.dataset_id,
+            "csv_name": options.get("csv_name"),
+            "dataset_id": analyzer.dataset_id,
+            "vlm_analysis_id": options.get("vlm_analysis_id"),
+            "format": export_format,
+            "is_zip": extension == "zip",
+            "status": "queued",
+            "stage": None,
+            "progress": 0.0,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "generated_at": None,
+            "file_size_bytes": None,
+            "sections_included": [],
+            "section_errors": {},
+            "total_plots": 0,
+            "error": None,
+            "path": os.path.join(self.exporter.export_dir, f"{export_id}.{extension}"),
+        }
+        with self.lock:
+            self._write_job(job)
+        self.executor.submit(self._run, export_id, analyzer, options)
+        return self.public(job)
+
+    def _run(self, export_id: str, analyzer, options: Dict[str, Any]):
+        path = self._read_job(export_id)["path"]
+        partial_path = f"{path}.part"
+        self._update(export_id, status="running")
+        try:
+            manifest = self.exporter.render(
+                analyzer, options, partial_path,
+                lambda stage, progress: self._update(export_id, stage=stage, progress=round(progress, 3))
+            )
+            os.replace(partial_path, path)
+            self._update(export_id, status="completed", stage=None, progress=1.0,
+                         generated_at=datetime.now(timezone.utc).isoformat(),
+                         file_size_bytes=os.path.getsize(path), **manifest)
+        except Exception as e:
+            logger.exception("Export %s failed", export_id)
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            self._update(export_id, status="failed", error=str(e))
+
+    def public(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Job record without server-side file paths"""
+        record = {k: v for k, v in job.items() if k != "path"}
+        record["download_url"] = f"/export/download/{job['export_id']}" if job["status"] == "completed" else None
+        return record
+
+    def export_item(self, job: Dict[str, Any], base_url: str) -> Dict[str, Any]:
+        """A finished export in the shape the client's export list reads"""
+        return {
+            "_id": job["export_id"],
+            "uid": job["uid"],
+            "csv_id": job["csv_id"],
+            "vlm_analysis_id": job["vlm_analysis_id"],
+            "csv_name": job["csv_name"] or job["dataset_id"],
+            "format": job["format"],
+            # The client downloads from this field directly, so it has to be an absolute URL
+            "cloudinary_url": f"{base_url.rstrip('/')}/export/download/{job['export_id']}",
+            "public_id": job["export_id"],
+            "file_size_bytes": job["file_size_bytes"],
+            "sections_included": job["sections_included"],
+            "total_plots": job["total_plots"],
+            "created_at": job["created_at"],
+        }
+
+    def get(self, export_id: str) -> Dict[str, Any]:
+        return self._read_job(export_id)
+
+    def list_for_dataset(self, csv_id: str, uid: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """Completed exports of a dataset, newest first"""
+        jobs = [job for job in self._jobs()
+                if job["csv_id"] == csv_id and job["status"] == "completed" and (uid is None or job["uid"] == uid)]
+        jobs.sort(key=lambda job: job["created_at"], reverse=True)
+        return jobs[:limit]
+
+    def cleanup(self) -> List[str]:
+        """Drop jobs older than the TTL and finished jobs beyond max_jobs, with their files"""
+        cutoff = datetime.fromtimestamp(time.time() - self.ttl, timezone.utc).isoformat()
+        jobs = self._jobs()
+        finished = sorted((job for job in jobs if job["status"] in ["completed", "failed"]),
+                          key=lambda job: job["created_at"], reverse=True)
+        # Jobs still running after the TTL belong to a worker that went away
+        expired = [job for job in jobs if job["created_at"] < cutoff] + \
+                  [job for job in finished[self.max_jobs:] if job["created_at"] >= cutoff]
+
+        for job in expired:
+            for path in [job["path"], self._job_path(job["export_id"])]:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        # Files without a job record, e.g. from an interrupted write
+        known = {job["export_id"] for job in jobs} - {job["export_id"] for job in expired}
+        for name in os.listdir(self.exporter.export_dir):
+            path = os.path.join(self.exporter.export_dir, name)
+            try:
+                if name.split(".")[0] not in known and os.path.getmtime(path) < time.time() - self.ttl:
+                    os.remove(path)
+            except FileNotFoundError:
+                continue
+        return [job["export_id"] for job in expired]
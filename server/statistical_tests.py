@@ -0,0 +1,258 @@
+from typing import Dict, List, Any, Optional, Tuple
+from itertools import combinations
+import pandas as pd
+import numpy as np
+import json
+from scipy import stats
+from scipy import sparse
+
+
+class BatchTester:
+    """Utility class that runs a family of hypothesis tests across many columns at once"""
+
+    TESTS = ["anova", "kruskal", "ttest", "chi2"]
+    CORRECTIONS = ["fdr_bh", "holm", "bonferroni", "none"]
+
+    def __init__(self, max_groups: int = 20, max_levels: int = 20):
+        self.max_groups = max_groups
+        self.max_levels = max_levels
+
+    def adjust_p_values(self, p_values: np.ndarray, method: str = "fdr_bh") -> np.ndarray:
+        """Correct p-values for multiple comparisons, ignoring NaN entries"""
+        if method not in self.CORRECTIONS:
+            raise ValueError(f"Unsupported correction '{method}'. Use one of: {', '.join(self.CORRECTIONS)}")
+
+        p_values = np.asarray(p_values, dtype=float)
+        adjusted = np.full_like(p_values, np.nan)
+        valid = ~np.isnan(p_values)
+        p = p_values[valid]
+        m = len(p)
+        if m == 0 or method == "none":
+            adjusted[valid] = p
+            return adjusted
+
+        if method == "bonferroni":
+            result = p * m
+        else:
+            order = np.argsort(p)
+            ranked = p[order]
+            if method == "holm":
+                ranked = np.maximum.accumulate(ranked * (m - np.arange(m)))
+            else:
+                ranked = np.minimum.accumulate((ranked * m / np.arange(1, m + 1))[::-1])[::-1]
+            result = np.empty(m)
+            result[order] = ranked
+        adjusted[valid] = np.minimum(result, 1.0)
+        return adjusted
+
+    def _numeric_columns(self, df: pd.DataFrame, columns: Optional[List[str]], exclude: str) -> List[str]:
+        if columns:
+            non_numeric = [c for c in columns if not pd.api.types.is_numeric_dtype(df[c]) or pd.api.types.is_bool_dtype(df[c])]
+            if non_numeric:
+                raise ValueError(f"Columns are not numeric: {', '.join(non_numeric)}")
+            return [c for c in columns if c != exclude]
+        return [c for c in df.select_dtypes(include=[np.number]).columns if c != exclude]
+
+    def _grouped_frame(self, df: pd.DataFrame, group_column: str, columns: List[str]):
+        """Rows with a known group, restricted to the largest groups"""
+        groups = df[group_column]
+        sizes = groups.value_counts()
+        if len(sizes) < 2:
+            raise ValueError(f"Group column '{group_column}' needs at least 2 groups")
+        keep = sizes.index[:self.max_groups]
+        mask = groups.isin(keep).to_numpy()
+        return df.loc[mask, columns].astype(float), groups[mask].astype(str)
+
+    def _group_aggregates(self, values: pd.DataFrame, groups: pd.Series):
+        """Per-group counts, sums and sums of squares of mean-centered values"""
+        centered = values - values.mean()
+        grouped = centered.groupby(groups)
+        count = grouped.count()
+        total = grouped.sum()
+        squares = (centered * centered).groupby(groups).sum()
+        return count, total, squares
+
+    def anova(self, df: pd.DataFrame, group_column: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """One-way ANOVA of every numeric column across the groups of group_column"""
+        columns = self._numeric_columns(df, columns, group_column)
+        values, groups = self._grouped_frame(df, group_column, columns)
+        count, total, squares = self._group_aggregates(values, groups)
+
+        n = count.sum()
+        k = (count > 0).sum()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            explained = (total ** 2 / count).sum()
+            between = explained - total.sum() ** 2 / n
+            within = squares.sum() - explained
+            df_between, df_within = k - 1, n - k
+            statistic = (between / df_between) / (within / df_within)
+        p_value = stats.f.sf(statistic, df_between, df_within)
+
+        return pd.DataFrame({
+            "column": columns,
+            "statistic": statistic.to_numpy(),
+            "p_value": p_value,
+            "df": [[int(a), int(b)] for a, b in zip(df_between, df_within)],
+            "effect_size": (between / (between + within)).to_numpy(),
+            "n": n.to_numpy().astype(int),
+        })
+
+    def _tie_sum(self, values: pd.Series) -> float:
+        """Sum of t^3 - t over groups of tied values, for the Kruskal-Wallis tie correction"""
+        tied = values.value_counts().to_numpy().astype(float)
+        return float((tied ** 3 - tied).sum())
+
+    def kruskal(self, df: pd.DataFrame, group_column: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Kruskal-Wallis H test of every numeric column across the groups of group_column"""
+        columns = self._numeric_columns(df, columns, group_column)
+        values, groups = self._grouped_frame(df, group_column, columns)
+        ranks = values.rank()
+        grouped = ranks.groupby(groups)
+        count = grouped.count()
+        rank_sums = grouped.sum()
+
+        n = count.sum()
+        k = (count > 0).sum()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            h = 12 / (n * (n + 1)) * (rank_sums ** 2 / count).sum() - 3 * (n + 1)
+            ties = pd.Series({col: self._tie_sum(values[col]) for col in columns})
+            h = h / (1 - ties / (n ** 3 - n))
+        p_value = stats.chi2.sf(h, k - 1)
+
+        return pd.DataFrame({
+            "column": columns,
+            "statistic": h.to_numpy(),
+            "p_value": p_value,
+            "df": (k - 1).to_numpy().astype(int),
+            "effect_size": (h / (n - 1)).to_numpy(),
+            "n": n.to_numpy().astype(int),
+        })
+
+    def ttest(self, df: pd.DataFrame, group_column: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Welch t-tests of every numeric column for every pair of groups"""
+        columns = self._numeric_columns(df, columns, group_column)
+        values, groups = self._grouped_frame(df, group_column, columns)
+        count, total, squares = self._group_aggregates(values, groups)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = total / count
+            var = (squares - total ** 2 / count) / (count - 1)
+
+        rows = []
+        for a, b in combinations(count.index, 2):
+            na, nb, va, vb = count.loc[a], count.loc[b], var.loc[a], var.loc[b]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                se2 = va / na + vb / nb
+                t = (mean.loc[a] - mean.loc[b]) / np.sqrt(se2)
+                dof = se2 ** 2 / ((va / na) ** 2 / (na - 1) + (vb / nb) ** 2 / (nb - 1))
+                pooled = np.sqrt(((na - 1) * va + (nb - 1) * vb) / (na + nb - 2))
+                cohens_d = (mean.loc[a] - mean.loc[b]) / pooled
+            rows.append(pd.DataFrame({
+                "column": columns,
+                "groups": [[a, b]] * len(columns),
+                "statistic": t.to_numpy(),
+                "p_value": 2 * stats.t.sf(np.abs(t), dof),
+                "df": dof.to_numpy(),
+                "effect_size": cohens_d.to_numpy(),
+                "n": (na + nb).to_numpy().astype(int),
+            }))
+        return pd.concat(rows, ignore_index=True)
+
+    def _category_codes(self, series: pd.Series) -> Tuple[np.ndarray, int]:
+        """Integer codes with rare levels folded into one, -1 for missing"""
+        top = series.value_counts().index[:self.max_levels - 1]
+        codes = pd.Categorical(series, categories=top).codes.astype(np.int64)
+        n_levels = len(top)
+        if series.nunique() > len(top):
+            codes = np.where((codes == -1) & series.notna().to_numpy(), n_levels, codes)
+            n_levels += 1
+        return codes, n_levels
+
+    def chi2(self, df: pd.DataFrame, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Chi-square test of independence for every pair of categorical columns"""
+        if not columns:
+            columns = df.select_dtypes(include=["object", "category", "bool"]).columns.tolist()
+        if len(columns) < 2:
+            raise ValueError("Need at least 2 categorical columns for chi-square tests")
+
+        # One sparse one-hot matrix; its Gram matrix holds every pairwise contingency table
+        row_index, col_index, offsets = [], [], [0]
+        for col in columns:
+            codes, n_levels = self._category_codes(df[col])
+            present = np.flatnonzero(codes >= 0)
+            row_index.append(present)
+            col_index.append(codes[present] + offsets[-1])
+            offsets.append(offsets[-1] + n_levels)
+        indicator = sparse.csc_matrix(
+            (np.ones(sum(len(r) for r in row_index)), (np.concatenate(row_index), np.concatenate(col_index))),
+            shape=(len(df), offsets[-1])
+        )
+
+        rows, statistics, dofs = [], [], []
+        for i in range(len(columns) - 1):
+            # Only the strip against later columns is multiplied, and only one table at a time is dense
+            strip = (indicator[:, offsets[i]:offsets[i + 1]].T @ indicator[:, offsets[i + 1]:]).tocsc()
+            for j in range(i + 1, len(columns)):
+                table = strip[:, offsets[j] - offsets[i + 1]:offsets[j + 1] - offsets[i + 1]].toarray()
+                table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+                n = table.sum()
+                r, c = table.shape
+                if r < 2 or c < 2:
+                    statistic, dof, cramers_v = np.nan, 0, np.nan
+                else:
+                    expected = np.outer(table.sum(axis=1), table.sum(axis=0)) / n
+                    statistic = float(((table - expected) ** 2 / expected).sum())
+                    dof = (r - 1) * (c - 1)
+                    cramers_v = float(np.sqrt(statistic / (n * (min(r, c) - 1))))
+                statistics.append(statistic)
+                dofs.append(dof)
+                rows.append({
+                    "columns": [columns[i], columns[j]],
+                    "statistic": statistic,
+                    "p_value": np.nan,
+                    "df": dof,
+                    "effect_size": cramers_v,
+                    "n": int(n),
+                })
+
+        # One vectorized survival function call for all pairs; untestable pairs keep NaN
+        statistics, dofs = np.array(statistics), np.array(dofs)
+        p_values = np.full(len(rows), np.nan)
+        testable = dofs > 0
+        p_values[testable] = stats.chi2.sf(statistics[testable], dofs[testable])
+        for row, p_value in zip(rows, p_values):
+            row["p_value"] = float(p_value)
+        return pd.DataFrame(rows)
+
+    def run(self, df: pd.DataFrame, test: str, group_column: Optional[str] = None, columns: Optional[List[str]] = None,
+            correction: str = "fdr_bh", alpha: float = 0.05) -> Dict[str, Any]:
+        """Run a test family, correct for multiple comparisons and rank results by p-value"""
+        if test not in self.TESTS:
+            raise ValueError(f"Unsupported test '{test}'. Use one of: {', '.join(self.TESTS)}")
+        missing = [c for c in (columns or []) + ([group_column] if group_column else []) if c not in df.columns]
+        if missing:
+            raise ValueError(f"Columns not found: {', '.join(missing)}")
+
+        if test == "chi2":
+            results = self.chi2(df, columns)
+        else:
+            if not group_column:
+                raise ValueError(f"Test '{test}' requires a group_column")
+            results = getattr(self, test)(df, group_column, columns)
+
+        results["p_adjusted"] = self.adjust_p_values(results["p_value"].to_numpy(), correction)
+        results["significant"] = results["p_adjusted"] < alpha
+        results = results.sort_values("p_value", na_position="last")
+
+        effect_sizes = {"anova": "eta_squared", "kruskal": "epsilon_squared", "ttest": "cohens_d", "chi2": "cramers_v"}
+        return {
+            "test": test,
+            "group_column": group_column,
+            "correction": correction,
+            "alpha": alpha,
+            "effect_size": effect_sizes[test],
+            "n_tests": int(len(results)),
+            "n_significant": int(results["significant"].sum()),
+            "results": json.loads(results.replace([np.inf, -np.inf], np.nan).to_json(orient="records",
+                                                                                      double_precision=15)),
+        }
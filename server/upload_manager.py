@@ -0,0 +1,231 @@
+from typing import Dict, List, Any, Optional, AsyncIterator, Tuple
+from datetime import datetime, timezone
+import hashlib
+import hmac
+import json
+import os
+import re
+import secrets
+import shutil
+import tempfile
+import time
+import uuid
+from logging import getLogger
+
+logger = getLogger(__name__)
+
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "statm8_uploads"))
+UPLOAD_SESSION_TTL_SECONDS = 24 * 3600
+UPLOAD_BLOB_TTL_SECONDS = int(os.getenv("UPLOAD_BLOB_TTL_SECONDS", str(7 * 24 * 3600)))
+HASH_CHUNK_BYTES = 1024 * 1024
+# Part files are named part-%06d
+MAX_PART_NUMBER = 10000
+CHALLENGE_BYTES = 1024 * 1024
+
+
+class UploadManager:
+    """Chunked, resumable uploads kept on local disk, with completed files stored by content hash"""
+
+    def __init__(self, upload_dir: str = UPLOAD_DIR, session_ttl: int = UPLOAD_SESSION_TTL_SECONDS,
+                 blob_ttl: int = UPLOAD_BLOB_TTL_SECONDS):
+        self.upload_dir = upload_dir
+        self.session_ttl = session_ttl
+        self.blob_ttl = blob_ttl
+        self.sessions_dir = os.path.join(upload_dir, "sessions")
+        self.blobs_dir = os.path.join(upload_dir, "blobs")
+        os.makedirs(self.sessions_dir, exist_ok=True)
+        os.makedirs(self.blobs_dir, exist_ok=True)
+
+    def _session_dir(self, upload_id: str) -> str:
+        if not re.fullmatch(r"[0-9a-f]{32}", upload_id):
+            raise KeyError(upload_id)
+        return os.path.join(self.sessions_dir, upload_id)
+
+    def _part_path(self, upload_id: str, part_number: int) -> str:
+        return os.path.join(self._session_dir(upload_id), f"part-{part_number:06d}")
+
+    def blob_path(self, content_hash: str) -> str:
+        return os.path.join(self.blobs_dir, content_hash)
+
+    def has_blob(self, content_hash: Optional[str]) -> bool:
+        return bool(content_hash) and re.fullmatch(r"[0-9a-f]{64}", content_hash) is not None \
+            and os.path.exists(self.blob_path(content_hash))
+
+    def _read_session(self, upload_id: str) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(self._session_dir(upload_id), "session.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise KeyError(upload_id)
+
+    def _write_json(self, path: str, data: Dict[str, Any]):
+        partial = f"{path}.{uuid.uuid4().hex}.part"
+        with open(partial, "w") as f:
+            json.dump(data, f)
+        os.replace(partial, path)
+
+    def _challenge(self, content_hash: str) -> Dict[str, Any]:
+        """A random byte range of a stored file that only a client holding the file can hash"""
+        size = os.path.getsize(self.blob_path(content_hash))
+        length = min(CHALLENGE_BYTES, size)
+        return {"nonce": secrets.token_hex(16), "offset": secrets.randbelow(size - length + 1), "length": length}
+
+    def _proof(self, content_hash: str, challenge: Dict[str, Any]) -> str:
+        digest = hashlib.sha256(challenge["nonce"].encode())
+        with open(self.blob_path(content_hash), "rb") as f:
+            f.seek(challenge["offset"])
+            digest.update(f.read(challenge["length"]))
+        return digest.hexdigest()
+
+    def init(self, filename: str, total_size: Optional[int] = None, sha256: Optional[str] = None) -> Dict[str, Any]:
+        """Start an upload session; content the server already has comes with a challenge instead of needing parts"""
+        self.cleanup()
+        upload_id = uuid.uuid4().hex
+        os.makedirs(self._session_dir(upload_id))
+        sha256 = sha256.lower() if sha256 else None
+        duplicate = self.has_blob(sha256) and (total_size is None or total_size == os.path.getsize(self.blob_path(sha256)))
+        if duplicate:
+            # Keep the file from expiring before the upload is completed
+            os.utime(self.blob_path(sha256))
+        session = {
+            "upload_id": upload_id,
+            "filename": filename,
+            "total_size": total_size,
+            "sha256": sha256,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            # The declared hash alone does not show the client has the file
+            "challenge": self._challenge(sha256) if duplicate else None,
+        }
+        self._write_json(os.path.join(self._session_dir(upload_id), "session.json"), session)
+        return {**session, "duplicate": duplicate}
+
+    async def write_part(self, upload_id: str, part_number: int, chunks: AsyncIterator[bytes]) -> Dict[str, Any]:
+        """Stream one part to disk, hashing it as it arrives; re-sending a part replaces it"""
+        if not 1 <= part_number <= MAX_PART_NUMBER:
+            raise ValueError(f"Part numbers run from 1 to {MAX_PART_NUMBER}")
+        self._read_session(upload_id)
+
+        path = self._part_path(upload_id, part_number)
+        partial = f"{path}.{uuid.uuid4().hex}.part"
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with open(partial, "wb") as f:
+                async for chunk in chunks:
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+            os.replace(partial, path)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+
+        part = {"part_number": part_number, "size": size, "sha256": digest.hexdigest()}
+        self._write_json(f"{path}.json", part)
+        return part
+
+    def parts(self, upload_id: str) -> List[Dict[str, Any]]:
+        session_dir = self._session_dir(upload_id)
+        parts = []
+        for name in sorted(os.listdir(session_dir)):
+            if re.fullmatch(r"part-\d{6}\.json", name):
+                with open(os.path.join(session_dir, name)) as f:
+                    parts.append(json.load(f))
+        return parts
+
+    def status(self, upload_id: str) -> Dict[str, Any]:
+        """Session with the parts received so far, so an interrupted client knows where to resume"""
+        session = self._read_session(upload_id)
+        parts = self.parts(upload_id)
+        numbers = [p["part_number"] for p in parts]
+        missing = sorted(set(range(1, max(numbers, default=0) + 1)) - set(numbers))
+        return {
+            **session,
+            "parts": parts,
+            "received_bytes": sum(p["size"] for p in parts),
+            "missing_parts": missing,
+        }
+
+    def complete(self, upload_id: str, proof: Optional[str] = None) -> Tuple[Dict[str, Any], str]:
+        """Join the parts into a content-addressed file and close the session; returns (session, sha256)
+
+        Without parts, the session must be a duplicate and `proof` the answer to its challenge.
+        """
+        session = self._read_session(upload_id)
+        parts = self.parts(upload_id)
+
+        if not parts:
+            challenge = session.get("challenge")
+            if challenge is None or not self.has_blob(session["sha256"]):
+                raise ValueError("No parts uploaded")
+            if not proof or not hmac.compare_digest(proof.lower(), self._proof(session["sha256"], challenge)):
+                raise ValueError("Proof does not match the challenge; upload the parts instead")
+            content_hash = session["sha256"]
+        else:
+            numbers = [p["part_number"] for p in parts]
+            if numbers != list(range(1, len(parts) + 1)):
+                missing = sorted(set(range(1, max(numbers) + 1)) - set(numbers))
+                raise ValueError(f"Missing parts: {', '.join(map(str, missing))}")
+            received = sum(p["size"] for p in parts)
+            if session["total_size"] is not None and received != session["total_size"]:
+                raise ValueError(f"Received {received} bytes, expected {session['total_size']}")
+            content_hash = self._assemble(upload_id, parts)
+            if session["sha256"] and session["sha256"] != content_hash:
+                raise ValueError("Uploaded content does not match the declared sha256")
+
+        shutil.rmtree(self._session_dir(upload_id), ignore_errors=True)
+        # Using a stored file renews its lease
+        os.utime(self.blob_path(content_hash))
+        return session, content_hash
+
+    def _assemble(self, upload_id: str, parts: List[Dict[str, Any]]) -> str:
+        """Concatenate parts while hashing the whole file; identical content is stored once"""
+        digest = hashlib.sha256()
+        partial = os.path.join(self.blobs_dir, f"{upload_id}.part")
+        try:
+            with open(partial, "wb") as out:
+                for part in parts:
+                    with open(self._part_path(upload_id, part["part_number"]), "rb") as f:
+                        while True:
+                            chunk = f.read(HASH_CHUNK_BYTES)
+                            if not chunk:
+                                break
+                            digest.update(chunk)
+                            out.write(chunk)
+            content_hash = digest.hexdigest()
+            if not os.path.exists(self.blob_path(content_hash)):
+                os.replace(partial, self.blob_path(content_hash))
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+        return content_hash
+
+    def abort(self, upload_id: str):
+        self._read_session(upload_id)
+        shutil.rmtree(self._session_dir(upload_id), ignore_errors=True)
+
+    def cleanup(self) -> List[str]:
+        """Remove sessions untouched for longer than the session TTL and stored files unused for longer than the blob TTL"""
+        removed = []
+        blob_cutoff = time.time() - self.blob_ttl
+        for name in os.listdir(self.blobs_dir):
+            path = os.path.join(self.blobs_dir, name)
+            try:
+                if os.path.getmtime(path) < blob_cutoff:
+                    os.remove(path)
+                    removed.append(name)
+            except FileNotFoundError:
+                continue
+
+        cutoff = time.time() - self.session_ttl
+        for upload_id in os.listdir(self.sessions_dir):
+            session_dir = os.path.join(self.sessions_dir, upload_id)
+            try:
+                last_touched = max([os.path.getmtime(session_dir)] +
+                                   [os.path.getmtime(os.path.join(session_dir, n)) for n in os.listdir(session_dir)])
+            except FileNotFoundError:
+                continue
+            if last_touched < cutoff:
+                shutil.rmtree(session_dir, ignore_errors=True)
+                removed.append(upload_id)
+        return removed